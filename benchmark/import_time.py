@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+# Modules loaded on first use only. Importing numerous must not pull them in.
+LAZY_MODULES = ['pandas', 'graphviz', 'fmpy', 'networkx']
+
+IMPORT_SCRIPT = f"""
+import sys
+import time
+start = time.perf_counter()
+import numerous.engine.model
+import numerous.engine.simulation
+import numerous.engine.system
+import numerous.multiphysics
+print(time.perf_counter() - start)
+print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))
+"""
+
+
+def import_time(repeat=5):
+    """
+    Best wall time of importing numerous in a fresh interpreter, and the lazy modules it loaded.
+    """
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], check=True, capture_output=True,
+                                text=True).stdout.splitlines()
+        dt = float(output[-2])
+        loaded = [m for m in output[-1].split(',') if m]
+        best = dt if best is None else min(best, dt)
+    return best, loaded
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+
+    dt, loaded = import_time()
+    print(f'import numerous: {dt:.3f}s (budget {budget:.3f}s)')
+    if loaded:
+        print(f'modules that should be imported lazily: {", ".join(loaded)}')
+    if dt > budget or loaded:
+        sys.exit(1)
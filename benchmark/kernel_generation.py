@@ -0,0 +1,77 @@
+import sys
+
+from numerous.engine.model import Model
+from numerous.engine.system import Item, Subsystem
+from numerous.multiphysics import EquationBase, Equation
+
+
+class Capacitance(EquationBase, Item):
+    def __init__(self, tag, C=100, T0=25):
+        super().__init__(tag)
+        self.add_constant('C', C)
+        self.add_parameter('P', 0)
+        self.add_state('T', T0)
+        thermal = self.create_namespace('thermal')
+        thermal.add_equations([self])
+
+    @Equation()
+    def eval(self, scope):
+        scope.T_dot = scope.P / scope.C - scope.T * 1e-3 * scope.global_vars.t
+
+
+class Conductance(EquationBase, Item):
+    def __init__(self, tag, side1, side2, k=1):
+        super().__init__(tag)
+        self.add_constant('k', k)
+        self.add_parameter('T1', 0)
+        self.add_parameter('T2', 0)
+        self.add_parameter('P1', 0)
+        self.add_parameter('P2', 0)
+        thermal = self.create_namespace('thermal')
+        thermal.add_equations([self])
+        thermal.T1 = side1.thermal.T
+        thermal.T2 = side2.thermal.T
+        side1.thermal.P += thermal.P1
+        side2.thermal.P += thermal.P2
+
+    @Equation()
+    def eval(self, scope):
+        P = (scope.T1 - scope.T2) * scope.k
+        scope.P1 = -P
+        scope.P2 = P
+
+
+class Series(Subsystem):
+    def __init__(self, tag, n):
+        super().__init__(tag)
+        nodes = [Capacitance(f'node{i}', T0=100 if i == 0 else 25) for i in range(n)]
+        conductors = [Conductance(f'conductor{i}', side1, side2)
+                      for i, (side1, side2) in enumerate(zip(nodes[:-1], nodes[1:]))]
+        self.register_items(nodes + conductors)
+
+
+def kernel_generation_time(n):
+    """
+    Time spent on kernel generation when assembling a series of `n` capacitances.
+    """
+    model = Model(Series('series', n), use_llvm=False)
+    return model.info["Assembly"]["Kernel generation"]["Time"]
+
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [100, 200, 400, 800]
+    # allowed growth of the time per item from the smallest to the largest system
+    tolerance = 2.0
+
+    # the first assembly pays for compiling numba helpers
+    kernel_generation_time(10)
+
+    per_item = []
+    for n in sizes:
+        dt = kernel_generation_time(n)
+        per_item.append(dt / n)
+        print(f'{n} items: {dt:.3f}s ({dt / n * 1e3:.3f} ms/item)')
+
+    if per_item[-1] > tolerance * per_item[0]:
+        print(f'kernel generation time per item grew {per_item[-1] / per_item[0]:.1f} times')
+        sys.exit(1)
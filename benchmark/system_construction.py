@@ -0,0 +1,62 @@
+import sys
+import time
+
+from numerous.engine.system import Item, Subsystem
+from numerous.engine.variables import VariableDescription, VariableType
+
+
+def build_items(n_items, n_variables=2):
+    items = []
+    for i in range(n_items):
+        item = Item(f'item{i}')
+        namespace = item.create_namespace('ns')
+        for j in range(n_variables):
+            namespace.create_variable_from_desc(VariableDescription(tag=f'v{j}', type=VariableType.PARAMETER,
+                                                                    initial_value=0.0))
+        items.append(item)
+    return items
+
+
+def build_system(items, fan_out):
+    """
+    Registers `items` in a tree of subsystems with at most `fan_out` items or subsystems per subsystem, bottom-up
+    as user systems are built, and computes the variable paths as Model construction does.
+    """
+    level = items
+    depth = 0
+    while len(level) > fan_out:
+        depth += 1
+        subsystems = []
+        for i in range(0, len(level), fan_out):
+            subsystem = Subsystem(f'subsystem{depth}_{i}')
+            subsystem.register_items(level[i:i + fan_out])
+            subsystems.append(subsystem)
+        level = subsystems
+    system = Subsystem('system')
+    system.register_items(level)
+    system.update_paths()
+    return system
+
+
+def construction_time(n_items, fan_out):
+    items = build_items(n_items)
+    start = time.perf_counter()
+    build_system(items, fan_out)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [1000, 10000, 100000]
+    # allowed growth of the time per item from the smallest to the largest system
+    tolerance = 3.0
+
+    for name, fan_out in [('flat', sys.maxsize), ('nested', 10)]:
+        per_item = []
+        for n_items in sizes:
+            dt = construction_time(n_items, fan_out)
+            per_item.append(dt / n_items)
+            print(f'{name} system of {n_items} items: {dt:.3f}s ({dt / n_items * 1e6:.1f} us/item)')
+
+        if per_item[-1] > tolerance * per_item[0]:
+            print(f'{name} construction time per item grew {per_item[-1] / per_item[0]:.1f} times')
+            sys.exit(1)
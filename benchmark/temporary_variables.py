@@ -0,0 +1,53 @@
+import sys
+import time
+from types import SimpleNamespace
+
+from numerous.engine.model.lowering.equations_generator import layout_temporary_variables
+from numerous.engine.variables import VariableType
+
+
+def variables_with_temporary_sets(n_sets, set_size=10):
+    """
+    Scope variables of `n_sets` set variables and a scalar variable per set, each assigned through a temporary
+    variable, in the form EquationGenerator receives them.
+    """
+    scope_variables = {}
+    temporary_variables = {}
+    for s in range(n_sets):
+        members = {f'set{s}_{i}': SimpleNamespace(id=f'set{s}_{i}', set_var_ix=i) for i in range(set_size)}
+        scope_variables.update(members)
+        scope_variables[f'scalar{s}'] = SimpleNamespace(id=f'scalar{s}', set_var_ix=None)
+        temporary_variables[f'tmp_set{s}'] = SimpleNamespace(
+            id=f'tmp_set{s}', type=VariableType.TMP_PARAMETER_SET, set_var=SimpleNamespace(variables=members),
+            tmp_vars=[SimpleNamespace(id=f'tmp_set{s}_{i}') for i in range(set_size)])
+        temporary_variables[f'tmp_scalar{s}'] = SimpleNamespace(
+            id=f'tmp_scalar{s}', type=VariableType.TMP_PARAMETER, scope_var_id=f'scalar{s}')
+    return scope_variables, temporary_variables
+
+
+def layout_time(n_sets, repeat=3):
+    scope_variables, temporary_variables = variables_with_temporary_sets(n_sets)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        layout_temporary_variables(scope_variables, temporary_variables)
+        dt = time.perf_counter() - start
+        best = dt if best is None else min(best, dt)
+    return len(scope_variables), best
+
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [1000, 10000, 100000]
+    # allowed growth of the time per variable from the smallest to the largest layout
+    tolerance = 3.0
+
+    per_variable = []
+    for n_sets in sizes:
+        n_variables, dt = layout_time(n_sets)
+        per_variable.append(dt / n_variables)
+        print(f'{n_sets} temporary set variables, {n_variables} variables: {dt:.3f}s '
+              f'({dt / n_variables * 1e9:.0f} ns/variable)')
+
+    if per_variable[-1] > tolerance * per_variable[0]:
+        print(f'layout time per variable grew {per_variable[-1] / per_variable[0]:.1f} times')
+        sys.exit(1)
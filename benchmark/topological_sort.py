@@ -0,0 +1,48 @@
+import sys
+import time
+
+import numpy as np
+
+from numerous.engine.model.graph_representation.lower_graph import _Graph
+
+
+def chain(n):
+    nodes = np.arange(n - 1)
+    return n, np.stack((nodes, nodes + 1), axis=1)
+
+
+def grid(n):
+    side = int(np.sqrt(n))
+    ix = np.arange(side * side).reshape(side, side)
+    right = np.stack((ix[:, :-1].ravel(), ix[:, 1:].ravel()), axis=1)
+    down = np.stack((ix[:-1, :].ravel(), ix[1:, :].ravel()), axis=1)
+    return side * side, np.concatenate((right, down))
+
+
+def sort_time(graph, n, repeat=3):
+    """
+    Best wall time of building the lower graph and sorting it topologically.
+    """
+    n_nodes, edges = graph(n)
+    edges = np.ascontiguousarray(edges, dtype=np.int64)
+    node_types = np.zeros(n_nodes, np.int64)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lower_graph = _Graph(n_nodes, edges, node_types)
+        lower_graph.topological_sort()
+        dt = time.perf_counter() - start
+        best = dt if best is None else min(best, dt)
+    assert lower_graph.cyclic_dependency < 0
+    return n_nodes, best
+
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [10 ** 5, 10 ** 6]
+    # compile once before timing
+    sort_time(chain, 10, repeat=1)
+
+    for graph in [chain, grid]:
+        for n in sizes:
+            n_nodes, dt = sort_time(graph, n)
+            print(f'{graph.__name__} {n_nodes} nodes: {dt:.3f}s ({dt / n_nodes * 1e9:.0f} ns/node)')
@@ -0,0 +1,48 @@
+import gc
+import sys
+import tracemalloc
+
+from numerous.engine.system import Item, Subsystem
+from numerous.engine.variables import VariableDescription, VariableType
+
+
+def build_system(n_items, n_variables=10):
+    """
+    A subsystem of `n_items` items with `n_variables` parameters each.
+    """
+    system = Subsystem('system')
+    items = []
+    for i in range(n_items):
+        item = Item(f'item{i}')
+        namespace = item.create_namespace('ns')
+        for j in range(n_variables):
+            namespace.create_variable_from_desc(VariableDescription(tag=f'v{j}', type=VariableType.PARAMETER,
+                                                                    initial_value=0.0))
+        items.append(item)
+    system.register_items(items)
+    return system
+
+
+def memory_per_variable(n_items, n_variables=10):
+    """
+    Bytes allocated per variable while building the system, and the number of variables.
+    """
+    gc.collect()
+    tracemalloc.start()
+    system = build_system(n_items, n_variables)
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del system
+    return allocated / (n_items * n_variables), n_items * n_variables
+
+
+if __name__ == "__main__":
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    per_variable, n = memory_per_variable(n_items)
+    print(f'{n} variables: {per_variable:.0f} bytes/variable')
+    if budget is not None and per_variable > budget:
+        print(f'memory per variable exceeds the budget of {budget:.0f} bytes')
+        sys.exit(1)
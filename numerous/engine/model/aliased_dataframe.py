@@ -1,8 +1,6 @@
 from copy import copy
 from typing import Sequence
 
-import pandas as pd
-
 
 class AliasedDataFrame:
     def __init__(self, data, aliases={}, rename_columns=True):
@@ -13,6 +11,7 @@ class AliasedDataFrame:
             for key in tmp:
                 if key in self.aliases.keys():
                     data[self.aliases[key]] = data.pop(key)
+        import pandas as pd
         self.df = pd.DataFrame(data)
 
     def __getitem__(self, names: str | Sequence[str]):
@@ -0,0 +1,60 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def _peak_memory() -> Optional[int]:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class AssemblyTimer:
+    """
+    Records wall time and process peak memory of the phases of model assembly.
+
+    Parameters
+    ----------
+    phases : dict
+        dict the phases are recorded into, by phase name.
+    hook : Callable[[str, dict], None], optional
+        called with the phase name and its record every time a phase finishes.
+    """
+
+    def __init__(self, phases: dict, hook: Optional[Callable[[str, dict], None]] = None):
+        self.phases = phases
+        self.hook = hook
+        self._lap_start = time.perf_counter()
+
+    def start(self):
+        self._lap_start = time.perf_counter()
+
+    def lap(self, name: str):
+        """
+        Record the time since the last call to :meth:`start` or :meth:`lap` as phase `name`.
+        """
+        now = time.perf_counter()
+        self.record(name, now - self._lap_start)
+        self._lap_start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, duration: float):
+        record = self.phases.setdefault(name, {"Time": 0.0, "Peak memory": None})
+        record["Time"] += duration
+        record["Peak memory"] = _peak_memory()
+        if self.hook is not None:
+            self.hook(name, record)
+
@@ -1,4 +1,6 @@
 import ast
+import inspect
+import re
 from textwrap import dedent
 
 from numerous.engine.variables import Variable
@@ -113,17 +115,53 @@ def _generate_equation_key(equation_id: str, is_set: bool) -> str:
     return eq_key
 
 
+_self_attribute = re.compile(r"self\.(\w+)")
+
+
+def _resolved_identity(value):
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return type(value).__name__, value
+    if inspect.ismethod(value):
+        return 'method', id(value.__func__), id(value.__self__)
+    return 'object', id(value)
+
+
+def _equation_signature(eq, is_set: bool):
+    """
+    Structural identity of an equation. Equations created separately for each instance (inline equations,
+    classes defined in factories) get their own id, but if they have the same source, run over the same kind of
+    namespace and resolve the same names to the same objects they lower to the same function and can share it.
+    Parameters and constants are variables and reach the function as arguments, so they never split a signature.
+    """
+    lines = getattr(eq, 'lines', None)
+    if lines is None:
+        return eq.id
+    try:
+        func = inspect.getclosurevars(eq).nonlocals['func']
+        closure_globals = inspect.getclosurevars(func).globals
+    except (KeyError, TypeError, ValueError):
+        closure_globals = {}
+    resolved = [(name, _resolved_identity(value)) for name, value in sorted(closure_globals.items())]
+    instance = getattr(eq, '__self__', None)
+    if instance is not None:
+        resolved += [('self.' + attr, _resolved_identity(getattr(instance, attr, None)))
+                     for attr in sorted(set(_self_attribute.findall(lines)))]
+    return lines, is_set, tuple(resolved)
+
+
 def replace_global_var_identification(dsource):
     return dsource.replace("global_vars.", "global_vars_")
 
 
 def parse_eq(model_namespace, item_id, mappings_graph: Graph, variables,
-             parsed_eq_branches, eq_used):
+             parsed_eq_branches, eq_used, eq_signatures=None):
+    if eq_signatures is None:
+        eq_signatures = {}
     for m in model_namespace.equation_dict.values():
         for eq in m:
             ns_path = model_namespace.full_tag
             is_set = model_namespace.is_set
-            eq_key = _generate_equation_key(eq.id, is_set)
+            eq_key = eq_signatures.setdefault(_equation_signature(eq, is_set), _generate_equation_key(eq.id, is_set))
             is_parsed_eq = eq_key in eq_used
             ast_tree = None
             if not is_parsed_eq:
@@ -144,7 +182,7 @@ def parse_eq(model_namespace, item_id, mappings_graph: Graph, variables,
                 g = ast_to_graph(ast_tree, eq_key, eq.file, eq.lineno, variables)
                 # Create branched versions of graph
                 branches_ = set()
-                [branches_.update(b.branches.keys()) for b in g.edges_c[:g.edge_counter] if b.branches]
+                [branches_.update(b.keys()) for b in g.edges_attr['branches'][:g.edge_counter] if b]
                 all_branches = [{}]
                 for b in branches_:
 
@@ -255,7 +293,7 @@ def process_mappings(mappings, mappings_graph: Graph, scope_vars):
                 mappings_graph.add_edge(Edge(ivar_node_e, t, e_type=EdgeType.MAPPING,
                                              mappings=[(ivar_set_var_ix, target_set_var_ix)]))
             else:
-                mappings_graph.edges_c[ix_[0]].mappings.append((ivar_set_var_ix, target_set_var_ix))
+                mappings_graph.edges_attr['mappings'][ix_[0]].append((ivar_set_var_ix, target_set_var_ix))
 
     log.info('Clone eq graph')
 
@@ -49,6 +49,20 @@ def generate_event_condition_ast(event_functions: list[Union[StateEvent, Timesta
         directions_array, dtype=np.float)
 
 
+def find_variable(path_to_variable: dict, path_to_root_str: str, path: str):
+    """
+    The variable that `path` refers to, relative to `path_to_root_str` or, outside of it, as an absolute path.
+    If both exist, the one first in `path_to_variable` is used. Returns None if there is no such variable.
+    """
+    relative_path = path_to_root_str + path
+    relative = path_to_variable.get(relative_path)
+    absolute = None if path.startswith(path_to_root_str) else path_to_variable.get(path)
+    if relative is None or absolute is None:
+        return absolute if relative is None else relative
+    paths = list(path_to_variable)
+    return relative if paths.index(relative_path) < paths.index(path) else absolute
+
+
 class VariablesVisitor(ast.NodeVisitor):
     def __init__(self, path_to_root_str, model, idx_type, closurevariables):
         self.path_to_root_str = path_to_root_str
@@ -67,32 +81,23 @@ class VariablesVisitor(ast.NodeVisitor):
                 return ast.NodeVisitor.generic_visit(self, node)
 
             if isinstance(node.slice.value, str):
-                for (var_path, var) in self.model.path_to_variable.items():
-                    if var_path.startswith(self.path_to_root_str):
-                        var_path = var_path[len(self.path_to_root_str):]
-                    if var_path == node.slice.value:
-                        node.slice.value = self.model._get_var_idx(var, self.idx_type)[0]
-                        break
-            if isinstance(node.slice.value, str):
-                raise KeyError(f'No such variable: {node.slice.value}')
+                var = find_variable(self.model.path_to_variable, self.path_to_root_str, node.slice.value)
+                if var is None:
+                    raise KeyError(f'No such variable: {node.slice.value}')
+                node.slice.value = self.model._get_var_idx(var, self.idx_type)[0]
 
         elif isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Name):
             if node.value.id != self.variables_name:
                 return ast.NodeVisitor.generic_visit(self, node)
 
-            found = False
             if node.slice.id not in self.assigned_variables:
                 raise KeyError(f"Variable {node.slice.id} is not assigned a value")
 
-            for (var_path, var) in self.model.path_to_variable.items():
-                if var_path.startswith(self.path_to_root_str):
-                    var_path = var_path[len(self.path_to_root_str):]
-                if var_path == self.assigned_variables[node.slice.id]:
-                    node.slice = ast.Constant(value=self.model._get_var_idx(var, self.idx_type)[0])
-                    found = True
-                    break
-            if not found:
+            var = find_variable(self.model.path_to_variable, self.path_to_root_str,
+                                self.assigned_variables[node.slice.id])
+            if var is None:
                 raise KeyError(f"No such variable: {self.assigned_variables[node.slice.id]}")
+            node.slice = ast.Constant(value=self.model._get_var_idx(var, self.idx_type)[0])
         elif isinstance(node, ast.Name):
             if node.id in self.closurevariables:
                 node = ast.Constant(value=self.closurevariables[node.id])
@@ -1,8 +1,8 @@
 import logging
+import sys
 from copy import copy
 
 import numpy as np
-from graphviz import Digraph
 from .utils import EdgeType, TemporaryKeyGenerator
 from .lower_graph import multi_replace, _Graph
 from numerous.utils import logger as log
@@ -35,7 +35,6 @@ class Node:
         self.func = func
         self.local_id = local_id
         self.scope_var = scope_var
-        self.deleted = False
         self.subgraph_test = subgraph_test
         self.subgraph_body = subgraph_body
         self.node_n = -1
@@ -43,6 +42,10 @@ class Node:
 
 
 class Edge:
+    """
+    Attributes of a new edge. The graph stores them in its edge columns when the edge is added, so an Edge is not
+    kept after :meth:`Graph.add_edge`.
+    """
     def __init__(self, start=-1, end=-1, e_type=EdgeType.UNDEFINED, label=None,
                  arg_local=None, is_local=False, mappings=None, branches=None):
         self.start = start
@@ -53,10 +56,64 @@ class Edge:
         self.branches = branches
         self.label = label
         self.mappings = mappings
-        self.deleted = False
         self.edge_n = -1
 
 
+def _csr(nodes, n_nodes):
+    valid = np.flatnonzero(nodes >= 0)
+    order = valid[np.argsort(nodes[valid], kind='stable')]
+    ptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(nodes[valid], minlength=n_nodes), out=ptr[1:])
+    return ptr, order
+
+
+class EdgeIndex:
+    """
+    Compressed sparse row index of the outgoing and incoming edges of each node, in edge order.
+
+    Edges added after the index was built are kept in per-node lists, and are merged into the compressed
+    arrays by :meth:`Graph.build_node_edges` once there are as many of them as indexed edges.
+    """
+    def __init__(self, edges, n_nodes):
+        self.n_nodes = n_nodes
+        self.n_edges = len(edges)
+        self.out_ptr, self.out_ix = _csr(edges[:, 0], n_nodes)
+        self.in_ptr, self.in_ix = _csr(edges[:, 1], n_nodes)
+        self.out_added = {}
+        self.in_added = {}
+        self.n_added = 0
+
+    def add(self, edge_n, start, end):
+        self.out_added.setdefault(start, []).append(edge_n)
+        self.in_added.setdefault(end, []).append(edge_n)
+        self.n_added += 1
+
+    def _edges(self, node, ptr, ix, added):
+        indexed = ix[ptr[node]:ptr[node + 1]] if node < self.n_nodes else ix[:0]
+        if node in added:
+            return np.concatenate((indexed, added[node]))
+        return indexed
+
+    def out_edges(self, node):
+        return self._edges(node, self.out_ptr, self.out_ix, self.out_added)
+
+    def in_edges(self, node):
+        return self._edges(node, self.in_ptr, self.in_ix, self.in_added)
+
+    def in_degree(self, n_nodes):
+        degree = np.zeros(n_nodes, dtype=np.int64)
+        degree[:self.n_nodes] = np.diff(self.in_ptr)
+        for node, added in self.in_added.items():
+            degree[node] += len(added)
+        return degree
+
+
+# Edge attributes that hold python objects, stored as one list per attribute
+EDGE_OBJECT_ATTRIBUTES = ('arg_local', 'mappings', 'branches', 'label')
+# Stored for nodes without a node type
+NO_NODE_TYPE = -1
+
+
 class Graph:
 
     def __init__(self, label=None, preallocate_items=1000):
@@ -69,9 +126,15 @@ class Graph:
         self.node_map = {}
         self.key_map = {}
         self.nodes = []
-        self.edges_c = []
         self.label = label
         self.edges = np.ones((self.preallocate_items, 2), dtype=np.int32) * -1
+        # Node and edge attributes used by the graph algorithms are stored as columns indexed by node or edge number
+        self.nodes_attr = {'node_type': np.full(self.preallocate_items, NO_NODE_TYPE, dtype=np.int8),
+                           'deleted': np.zeros(self.preallocate_items, dtype=np.bool_)}
+        self.edges_attr = {'e_type': np.full(self.preallocate_items, EdgeType.UNDEFINED, dtype=np.int8),
+                           'is_local': np.zeros(self.preallocate_items, dtype=np.bool_),
+                           'deleted': np.zeros(self.preallocate_items, dtype=np.bool_)}
+        self.edges_attr.update({attr: [] for attr in EDGE_OBJECT_ATTRIBUTES})
         self.lower_graph = None
 
         self.node_edges = None
@@ -81,28 +144,69 @@ class Graph:
         self.skipped_arg_metadata = []
 
     def build_node_edges(self):
-        self.node_edges = [([], []) for _ in range(self.node_counter)]
-        for i, e in enumerate(self.edges[:self.edge_counter]):
-            self.node_edges[e[0]][0].append(i)
-            self.node_edges[e[1]][1].append(i)
+        self.node_edges = EdgeIndex(self.edges[:self.edge_counter], self.node_counter)
+
+    def _grow(self, required):
+        """
+        Grow the node and edge columns geometrically so that at least `required` items fit.
+        """
+        allocated = max(required, 2 * self.allocated)
+
+        def grown(column, fill):
+            new_column = np.full((allocated,) + column.shape[1:], fill, dtype=column.dtype)
+            new_column[:self.allocated] = column
+            return new_column
+
+        self.edges = grown(self.edges, -1)
+        self.nodes_attr = {'node_type': grown(self.nodes_attr['node_type'], NO_NODE_TYPE),
+                           'deleted': grown(self.nodes_attr['deleted'], False)}
+        self.edges_attr.update({'e_type': grown(self.edges_attr['e_type'], EdgeType.UNDEFINED),
+                                'is_local': grown(self.edges_attr['is_local'], False),
+                                'deleted': grown(self.edges_attr['deleted'], False)})
+        self.allocated = allocated
+
+    def _edge_index(self):
+        if self.node_edges is None or self.node_edges.n_added > max(self.node_edges.n_edges, 1000):
+            self.build_node_edges()
+        return self.node_edges
+
+    def out_edges(self, node, e_type=None):
+        """
+        Indices of the edges starting in `node`, optionally only the not deleted edges of type `e_type`.
+        """
+        return self._filter_edges(self._edge_index().out_edges(node), e_type)
+
+    def in_edges(self, node, e_type=None):
+        """
+        Indices of the edges ending in `node`, optionally only the not deleted edges of type `e_type`.
+        """
+        return self._filter_edges(self._edge_index().in_edges(node), e_type)
+
+    def _filter_edges(self, ix, e_type):
+        if e_type is None:
+            return ix
+        return ix[(self.edges_attr['e_type'][ix] == e_type) & ~self.edges_attr['deleted'][ix]]
 
     def add_node(self, node, ignore_existing=False, skip_existing=True):
         if not node.key:
             node.key = tmp_generator()
+        elif isinstance(node.key, str):
+            node.key = sys.intern(node.key)
         if node.key not in self.node_map or ignore_existing:
             if not node.key in self.node_map:
 
                 node_n = self.node_counter
+                if node_n >= self.allocated:
+                    self._grow(node_n + 1)
                 self.node_map[node.key] = node_n
                 self.key_map[node_n] = node.key
                 self.node_counter += 1
 
-                if self.node_counter > self.allocated:
-                    raise ValueError('Exceeding allocation')
-
             else:
                 node_n = self.node_map[node.key]
             node.node_n = node_n
+            self.nodes_attr['node_type'][node_n] = NO_NODE_TYPE if node.node_type is None else node.node_type
+            self.nodes_attr['deleted'][node_n] = False
             if node_n < len(self.nodes):
                 self.nodes[node_n] = node
             else:
@@ -117,16 +221,19 @@ class Graph:
 
     def add_edge(self, edge: Edge):
         edge_n = self.edge_counter
+        if edge_n >= self.allocated:
+            self._grow(edge_n + 1)
         self.edges[edge_n, :] = [edge.start, edge.end]
 
         self.edge_counter += 1
 
-        if self.edge_counter > self.allocated:
-            raise ValueError('Exceeding allocation')
-        self.edges_c.append(edge)
+        if self.node_edges is not None:
+            self.node_edges.add(edge_n, edge.start, edge.end)
+        self.edges_attr['e_type'][edge_n] = edge.e_type
+        self.edges_attr['is_local'][edge_n] = edge.is_local
+        for attr in EDGE_OBJECT_ATTRIBUTES:
+            self.edges_attr[attr].append(getattr(edge, attr))
         edge.edge_n = edge_n
-        if edge.e_type == EdgeType.TARGET:
-            pass
         return edge_n
 
     def set_edge(self, edge, start=None, end=None):
@@ -134,9 +241,10 @@ class Graph:
             self.edges[edge, 0] = start
         if end:
             self.edges[edge, 1] = end
+        self.node_edges = None
 
     def remove_node(self, node_n):
-        self.nodes[node_n].deleted = True
+        self.nodes_attr['deleted'][node_n] = True
 
     def clean(self):
         log.info('Cleaning eq graph')
@@ -145,11 +253,17 @@ class Graph:
         return self
 
     def remove_edge(self, edge_n):
-        self.edges_c[edge_n].deleted = True
+        self.edges_attr['deleted'][edge_n] = True
 
     def get_where_node_attr(self, attr, val, not_=False):
+        if attr in self.nodes_attr:
+            match = self.nodes_attr[attr][:self.node_counter] == val
+            if not_:
+                match = ~match
+            return np.flatnonzero(match & ~self.nodes_attr['deleted'][:self.node_counter]).tolist()
+
         def filter_function(node):
-            if node.deleted:
+            if self.nodes_attr['deleted'][node.node_n]:
                 return False
             if getattr(node, attr) == val:
                 return True and not not_
@@ -160,67 +274,55 @@ class Graph:
 
     def get_edges_for_node(self, start_node=None, end_node=None):
         if start_node is not None:
-            start_ix = self.edges[:self.edge_counter, 0] == start_node
-            start_ = self.edges[:self.edge_counter][start_ix]
-        else:
-            start_ = self.edges[:self.edge_counter, :]
-            start_ix = range(self.edge_counter)
-        if end_node is not None:
-            end_ix = start_[:, 1] == end_node
-            end_ = self.edges[:self.edge_counter][end_ix]
-
+            ix = self.out_edges(start_node)
+            if end_node is not None:
+                ix = ix[self.edges[ix, 1] == end_node]
+        elif end_node is not None:
+            ix = self.in_edges(end_node)
         else:
-            end_ix = start_ix
-            end_ = start_
+            ix = np.arange(self.edge_counter)
 
-        return zip(np.argwhere(end_ix), end_)
+        return zip(ix.reshape(-1, 1), self.edges[ix])
 
     def get_edges_type_for_node_filter(self, start_node: int = None, end_node: int = None, val=None):
         if start_node and end_node:
             raise ValueError('arg cant have both start and end!')
         ix = []
-        if not self.node_edges:
-            self.build_node_edges()
 
         if not start_node is None:
-            ix = self.node_edges[start_node][0]
+            ix = self.out_edges(start_node)
 
         if not end_node is None:
-            ix = self.node_edges[end_node][1]
+            ix = self.in_edges(end_node)
 
         if start_node is None and end_node is None:
             print(end_node)
             print(start_node)
             raise ValueError('Need at least one node!')
 
-        def filter_function(edge):
-            if edge.deleted:
-                return False
-            if edge.e_type == val:
-                return True
-            else:
-                return False
-
-        ix_r = [edge.edge_n for edge in filter(filter_function, map(self.edges_c.__getitem__, ix))]
+        ix = ix.tolist()
+        e_types = self.edges_attr['e_type'][ix].tolist()
+        deleted = self.edges_attr['deleted'][ix].tolist()
+        ix_r = [i for i, e_type, d in zip(ix, e_types, deleted) if not d and e_type == val]
         return ix_r, [self.edges[i, :] for i in ix_r]
 
     def has_edge_for_nodes(self, start_node=None, end_node=None):
 
-        if start_node and end_node:
-            return np.where(
-                (self.edges[:self.edge_counter, 0] == start_node) & (self.edges[:self.edge_counter, 1] == end_node))[0]
+        if start_node is not None and end_node is not None:
+            ix = self.out_edges(start_node)
+            return ix[self.edges[ix, 1] == end_node]
 
-        if start_node:
-            return start_node in self.edges[:, 0]
+        if start_node is not None:
+            return len(self.out_edges(start_node)) > 0
 
-        if end_node:
-            return end_node in self.edges[:, 1]
+        if end_node is not None:
+            return len(self.in_edges(end_node)) > 0
 
     def clone(self):
-        from copy import deepcopy
         clone_ = Graph(preallocate_items=self.preallocate_items)
 
         clone_.preallocate_items = self.preallocate_items
+        clone_.allocated = self.allocated
         clone_.edge_counter = self.edge_counter
         clone_.node_counter = self.node_counter
         # Maps a key to an integer which is the internal node_id
@@ -228,8 +330,11 @@ class Graph:
         clone_.key_map = self.key_map.copy()
 
         clone_.nodes = self.nodes.copy()
-        clone_.edges_c = deepcopy(self.edges_c)
         clone_.edges = self.edges.copy()
+        clone_.nodes_attr = {attr: column.copy() for attr, column in self.nodes_attr.items()}
+        clone_.edges_attr = {attr: column.copy() for attr, column in self.edges_attr.items()}
+        # mappings lists are appended to in place, so they are not shared with the clone
+        clone_.edges_attr['mappings'] = [copy(m) for m in self.edges_attr['mappings']]
 
         return clone_
 
@@ -247,15 +352,17 @@ class Graph:
 
     def as_graphviz(self, file, force=False):
         if False or force:
+            from graphviz import Digraph
             dot = Digraph()
             for k, n in self.node_map.items():
                 dot.node(k, label=self.nodes[n].label)
 
             for i, e in enumerate(self.edges[:self.edge_counter]):
-                if not self.edges_c[i].deleted:
+                if not self.edges_attr['deleted'][i]:
                     try:
                         if e[0] >= 0 and e[1] >= 0:
-                            dot.edge(self.key_map[e[0]], self.key_map[e[1]], label=str(self.edges_c[i].e_type))
+                            dot.edge(self.key_map[e[0]], self.key_map[e[1]],
+                                     label=str(EdgeType(self.edges_attr['e_type'][i])))
                     except Exception as e:
                         print(e)
                         raise
@@ -263,12 +370,13 @@ class Graph:
             dot.render(file, view=True, format='pdf')
 
     def zero_in_degree(self):
-        return [n for n in self.node_map.values() if len(list(self.get_edges_for_node(end_node=n))) == 0]
+        in_degree = self._edge_index().in_degree(self.node_counter)
+        return [n for n in self.node_map.values() if in_degree[n] == 0]
 
     def make_lower_graph(self, top_sort=False):
         self.lower_graph = _Graph(self.node_counter,
                                   np.array(self.edges[:self.edge_counter], np.int64),
-                                  np.array([node.node_type for node in self.nodes[:self.node_counter]], np.int64))
+                                  self.nodes_attr['node_type'][:self.node_counter].astype(np.int64))
 
         if top_sort:
             self.lower_graph.topological_sort()
@@ -294,8 +402,10 @@ class Graph:
 
         if self.lower_graph.cyclic_dependency >= 0:
 
-            unsorted_nodes = set(self.lower_graph.nodes).difference(set(self.lower_graph.topological_sorted_nodes))
             self.cyclic_path = self.lower_graph.cyclic_path
+            self.cyclic_components = self.get_cyclic_components()
+            log.warning(f'{len(self.cyclic_components)} cyclic dependencies found, nodes on and after them are '
+                        f'ordered by their strongly connected components')
             if not ignore_cyclic:
                 cg = self.graph_from_path(self.cyclic_path)
                 cg.as_graphviz('cyclic', force=True)
@@ -305,12 +415,23 @@ class Graph:
 
                 self.cyclic_dependency = self.lower_graph.cyclic_dependency
                 raise ValueError('Cyclic path detected: ', self.cyclic_path)
-            else:
-                self.lower_graph.topological_sorted_nodes[-len(unsorted_nodes):] = list(unsorted_nodes)
 
         log.info("Topological sort finished")
         return self.lower_graph.topological_sorted_nodes
 
+    def get_cyclic_components(self):
+        """
+        Keys of the nodes of each strongly connected component of the last topological sort that contains a cycle.
+        """
+        lower_graph = self.lower_graph
+        unsorted = lower_graph.topological_sorted_nodes[lower_graph.n_sorted:]
+        components = {}
+        for n in unsorted:
+            components.setdefault(lower_graph.component[n], []).append(n)
+        self_loops = {n for n in unsorted if n in self.edges[self.out_edges(n), 1]}
+        return [[self.key_map[n] for n in nodes] for nodes in components.values()
+                if len(nodes) > 1 or nodes[0] in self_loops]
+
     def get_dependants_graph(self, node):
         if not self.lower_graph:
             self.make_lower_graph()
@@ -323,4 +444,5 @@ class Graph:
         edges = self.edges[:self.edge_counter]
 
         multi_replace(edges, to_be_replaced_v, n)
+        self.node_edges = None
         [self.remove_node(t) for t in to_be_replaced_v]
@@ -9,7 +9,7 @@ def multi_replace(arr, to_rep, new_val):
         arr[:] = np.where(arr == t, new_val, arr)
 
 
-@njit('i8(i8[:],i8)', cache=False)
+@njit
 def index(array, item):
     for ix, val in np.ndenumerate(array):
         if val == item:
@@ -17,31 +17,117 @@ def index(array, item):
     return int64(-1)
 
 
-@njit('Tuple((i8, i8[:]))(i8,i8[:],i8[:,:])', cache=False)
-def depth_first_search(node, path, children):
-    children_of_node = children[node, :]
-    for i in range(children_of_node[0]):
+@njit
+def csr(nodes, n_nodes):
+    """
+    Offsets and edge indices of the edges of each node, grouped by `nodes` in edge order.
+    """
+    ptr = np.zeros(n_nodes + 1, int64)
+    for n in nodes:
+        ptr[n + 1] += 1
+    for i in range(n_nodes):
+        ptr[i + 1] += ptr[i]
+    fill = ptr[:-1].copy()
+    ix = np.zeros(len(nodes), int64)
+    for i, n in enumerate(nodes):
+        ix[fill[n]] = i
+        fill[n] += 1
+    return ptr, ix
 
-        c = children_of_node[i + 1]
-        if len(path) > 0:
-            if index(path, c) >= 0:
-                return c, np.append(path, c)
 
-        path_ = np.append(path, c)
+@njit
+def strongly_connected_components(nodes, edges, out_ptr, out_edges, n_nodes):
+    """
+    Iterative Tarjan's algorithm over the subgraph reached from `nodes`. Returns the component of each node (-1 for
+    nodes not reached) and the number of components. Components are numbered in reverse topological order.
+    """
+    component = np.full(n_nodes, -1, int64)
+    order = np.full(n_nodes, -1, int64)
+    low = np.zeros(n_nodes, int64)
+    on_stack = np.zeros(n_nodes, np.bool_)
+    stack = np.zeros(n_nodes, int64)
+    call_node = np.zeros(n_nodes, int64)
+    call_edge = np.zeros(n_nodes, int64)
+    n_stack = 0
+    n_ordered = 0
+    n_components = 0
+
+    for s in nodes:
+        if order[s] >= 0:
+            continue
+        order[s] = low[s] = n_ordered
+        n_ordered += 1
+        stack[n_stack] = s
+        n_stack += 1
+        on_stack[s] = True
+        call_node[0] = s
+        call_edge[0] = out_ptr[s]
+        n_calls = 1
+
+        while n_calls > 0:
+            v = call_node[n_calls - 1]
+            k = call_edge[n_calls - 1]
+            if k < out_ptr[v + 1]:
+                call_edge[n_calls - 1] = k + 1
+                w = edges[out_edges[k], 1]
+                if order[w] < 0:
+                    order[w] = low[w] = n_ordered
+                    n_ordered += 1
+                    stack[n_stack] = w
+                    n_stack += 1
+                    on_stack[w] = True
+                    call_node[n_calls] = w
+                    call_edge[n_calls] = out_ptr[w]
+                    n_calls += 1
+                elif on_stack[w]:
+                    low[v] = min(low[v], order[w])
+            else:
+                n_calls -= 1
+                if n_calls > 0:
+                    u = call_node[n_calls - 1]
+                    low[u] = min(low[u], low[v])
+                if low[v] == order[v]:
+                    while True:
+                        n_stack -= 1
+                        w = stack[n_stack]
+                        on_stack[w] = False
+                        component[w] = n_components
+                        if w == v:
+                            break
+                    n_components += 1
+
+    return component, n_components
 
-        cyclic_dependency, cyclic_path = depth_first_search(c, path_, children)
-        if cyclic_dependency >= 0:
-            return cyclic_dependency, cyclic_path
 
-    return int64(-1), np.zeros((0,), dtype=int64)
+@njit
+def find_cycle(start, edges, out_ptr, out_edges, component):
+    """
+    A cycle through the nodes of the component of `start`, closed by repeating its first node.
+    """
+    position = np.full(len(component), -1, int64)
+    path = np.zeros(len(component) + 1, int64)
+    n_path = 0
+    node = start
+    while position[node] < 0:
+        position[node] = n_path
+        path[n_path] = node
+        n_path += 1
+        for k in range(out_ptr[node], out_ptr[node + 1]):
+            child = edges[out_edges[k], 1]
+            if component[child] == component[start]:
+                node = child
+                break
+    cycle = path[position[node]:n_path + 1].copy()
+    cycle[-1] = node
+    return cycle
 
 
-@njit('Tuple((i8, i8, i8))(i8[:,:],i8[:,:],i8,i8[:,:],i8,i8[:],i8,i8[:], i8, i8[:])', cache=False)
-def walk_parents(parent_edges, self_edges, n, edges, ix, visited_edges, n_visited, node_types, deriv_dep_count,
+@njit
+def walk_parents(in_ptr, in_edges, self_edges, n, edges, ix, visited_edges, n_visited, node_types, deriv_dep_count,
                  deriv_dep):
-    for i in range(parent_edges[n, 0]):
+    for k in range(in_ptr[n], in_ptr[n + 1]):
 
-        e = self_edges[parent_edges[n, i + 1]]
+        e = self_edges[in_edges[k]]
 
         if index(visited_edges[:n_visited], e[2]) < 0:
 
@@ -52,8 +138,9 @@ def walk_parents(parent_edges, self_edges, n, edges, ix, visited_edges, n_visite
             ix += 1
             if node_types[e[0]] < 3:
 
-                ix, n_visited, deriv_dep_count = walk_parents(parent_edges, self_edges, e[0], edges, ix, visited_edges,
-                                                              n_visited, node_types, deriv_dep_count, deriv_dep)
+                ix, n_visited, deriv_dep_count = walk_parents(in_ptr, in_edges, self_edges, e[0], edges, ix,
+                                                              visited_edges, n_visited, node_types, deriv_dep_count,
+                                                              deriv_dep)
             elif node_types[e[0]] == 3:
                 deriv_dep[deriv_dep_count] = e[0]
                 deriv_dep_count += 1
@@ -61,10 +148,10 @@ def walk_parents(parent_edges, self_edges, n, edges, ix, visited_edges, n_visite
     return ix, n_visited, deriv_dep_count
 
 
-@njit('Tuple((i8, i8))(i8[:,:],i8[:,:],i8,i8[:,:],i8,i8[:],i8,i8[:])', cache=False)
-def walk_parents_to_var(parent_edges, self_edges, n, edges, ix, visited_edges, n_visited, node_types):
-    for i in range(parent_edges[n, 0]):
-        e = self_edges[parent_edges[n, i + 1]]
+@njit
+def walk_parents_to_var(in_ptr, in_edges, self_edges, n, edges, ix, visited_edges, n_visited, node_types):
+    for k in range(in_ptr[n], in_ptr[n + 1]):
+        e = self_edges[in_edges[k]]
         if index(visited_edges[:n_visited], e[2]) < 0:
 
             # if e[1] == n:
@@ -75,17 +162,18 @@ def walk_parents_to_var(parent_edges, self_edges, n, edges, ix, visited_edges, n
             ix += 1
 
             if node_types[e[0]] < 2:
-                ix, n_visited = walk_parents_to_var(parent_edges, self_edges, e[0], edges, ix, visited_edges, n_visited,
-                                                    node_types)
+                ix, n_visited = walk_parents_to_var(in_ptr, in_edges, self_edges, e[0], edges, ix, visited_edges,
+                                                    n_visited, node_types)
 
     return ix, n_visited
 
 
-@njit('Tuple((i8, i8))(i8[:,:],i8[:,:],i8[:,:],i8,i8[:,:],i8,i8[:],i8,i8[:])', cache=False)
-def walk_children(parent_edges, children_edges, self_edges, n, edges, ix, visited_edges, n_visited, node_types):
-    for i in range(children_edges[n, 0]):
+@njit
+def walk_children(in_ptr, in_edges, out_ptr, out_edges, self_edges, n, edges, ix, visited_edges, n_visited,
+                  node_types):
+    for k in range(out_ptr[n], out_ptr[n + 1]):
 
-        e = self_edges[children_edges[n, i + 1]]
+        e = self_edges[out_edges[k]]
 
         if index(visited_edges[:n_visited], e[2]) < 0:
 
@@ -94,18 +182,18 @@ def walk_children(parent_edges, children_edges, self_edges, n, edges, ix, visite
 
             edges[ix, :] = e
             ix += 1
-            ix, n_visited = walk_children(parent_edges, children_edges, self_edges, e[1], edges, ix, visited_edges,
-                                          n_visited, node_types)
+            ix, n_visited = walk_children(in_ptr, in_edges, out_ptr, out_edges, self_edges, e[1], edges, ix,
+                                          visited_edges, n_visited, node_types)
 
             # if e[1] == n:
             if node_types[e[0]] < 2:
-                ix, n_visited = walk_parents_to_var(parent_edges, self_edges, e[0], edges, ix, visited_edges, n_visited,
-                                                    node_types)
+                ix, n_visited = walk_parents_to_var(in_ptr, in_edges, self_edges, e[0], edges, ix, visited_edges,
+                                                    n_visited, node_types)
 
     return ix, n_visited
 
 
-@njit('Tuple((i8, i8))(i8[:,:],i8,i8[:,:],i8,i8[:],i8,i8[:])', cache=False)
+@njit
 def walk_parents_to_var_(self_edges, n, edges, ix, visited_edges, n_visited, node_types):
     for e in self_edges:
         if index(visited_edges[:n_visited], e[2]) < 0:
@@ -124,7 +212,7 @@ def walk_parents_to_var_(self_edges, n, edges, ix, visited_edges, n_visited, nod
     return ix, n_visited
 
 
-@njit('Tuple((i8, i8))(i8[:,:],i8,i8[:,:],i8,i8[:],i8,i8[:])', cache=False)
+@njit
 def walk_children_(self_edges, n, edges, ix, visited_edges, n_visited, node_types):
     for e in self_edges:
 
@@ -147,18 +235,20 @@ def walk_children_(self_edges, n, edges, ix, visited_edges, n_visited, node_type
 
 
 spec = [
-    ('n_children_max', int64),
     ('n_nodes', int64),
     ('n_edges', int64),
     ('nodes', int64[:]),
     ('node_types', int64[:]),
     ('edges', int64[:, :]),
-    ('children', int64[:, :]),
-    ('parent_edges', int64[:, :]),
-    ('children_edges', int64[:, :]),
-    ('ancestors', int64[:, :]),
+    ('out_ptr', int64[:]),
+    ('out_edges', int64[:]),
+    ('in_ptr', int64[:]),
+    ('in_edges', int64[:]),
     ('indegree_map', int64[:]),
     ('topological_sorted_nodes', int64[:]),
+    ('n_sorted', int64),
+    ('component', int64[:]),
+    ('n_components', int64),
     ('cyclic_dependency', int64),
     ('cyclic_path', int64[:])
 
@@ -169,7 +259,6 @@ spec = [
 class _Graph:
     def __init__(self, n_nodes: int64, edges: int64[:], node_types):
 
-        self.n_children_max = 100
         self.n_nodes = n_nodes
         self.nodes = np.arange(self.n_nodes)
 
@@ -179,70 +268,30 @@ class _Graph:
 
         self.edges = edges
 
-        self.indegree_map = np.zeros(self.n_nodes, np.int64)
-
-        self.children = np.zeros((self.n_nodes, self.n_children_max), np.int64)
-
-        self.parent_edges = np.zeros((self.n_nodes, self.n_children_max), np.int64)
+        # Edges of each node in compressed sparse row form
+        out_ptr, out_edges = csr(self.edges[:, 0], self.n_nodes)
+        in_ptr, in_edges = csr(self.edges[:, 1], self.n_nodes)
+        self.out_ptr = out_ptr
+        self.out_edges = out_edges
+        self.in_ptr = in_ptr
+        self.in_edges = in_edges
 
-        self.children_edges = np.zeros((self.n_nodes, self.n_children_max), np.int64)
+        self.indegree_map = np.zeros(self.n_nodes, np.int64)
 
         self.cyclic_dependency = np.int64(-1)
         self.cyclic_path = np.zeros((0,), np.int64)
+        self.component = np.arange(self.n_nodes)
+        self.n_components = self.n_nodes
 
         self.in_degree()
 
-        self.make_children_map()
         self.topological_sorted_nodes = np.zeros(self.n_nodes, np.int64)
+        self.n_sorted = 0
 
     def in_degree(self):
-
-        for j in range(self.n_edges):
-            self.indegree_map[self.edges[j][1]] += 1
+        self.indegree_map = self.in_ptr[1:] - self.in_ptr[:-1]
         return self.indegree_map
 
-    def make_children_map(self):
-
-        for i, e in enumerate(self.edges):
-            row = self.children[e[0], :]
-            row[0] += 1
-            if row[0] > self.n_children_max - 1:
-                raise ValueError('More children than allowed!')
-            row[row[0]] = e[1]
-
-            row_pe = self.parent_edges[e[1], :]
-            row_pe[0] += 1
-            if row_pe[0] > self.n_children_max - 1:
-                raise ValueError('More parents than allowed!')
-            row_pe[row_pe[0]] = i
-
-            row_ce = self.children_edges[e[0], :]
-            row_ce[0] += 1
-            if row_ce[0] > self.n_children_max - 1:
-                raise ValueError('More parents than allowed!')
-            row_ce[row_ce[0]] = i
-
-    def make_edges_map(self, edges, nodes):
-        n_nodes = len(nodes)
-        parent_edges = np.zeros((n_nodes, self.n_children_max), int64)
-        children_edges = np.zeros((n_nodes, self.n_children_max), int64)
-
-        for i, e in enumerate(edges):
-
-            row_pe = parent_edges[e[1], :]
-            row_pe[0] += 1
-            if row_pe[0] > self.n_children_max - 1:
-                raise ValueError('More parents than allowed!')
-            row_pe[row_pe[0]] = e[2]
-
-            row_ce = children_edges[e[0], :]
-            row_ce[0] += 1
-            if row_ce[0] > self.n_children_max - 1:
-                raise ValueError('More parents than allowed!')
-            row_ce[row_ce[0]] = e[2]
-
-        return parent_edges, children_edges
-
     def get_zero_indegree(self):
         n_zero_indegree = 0
         zero_indegree = np.zeros(self.n_nodes, dtype=int64)
@@ -254,45 +303,72 @@ class _Graph:
         return zero_indegree, n_zero_indegree
 
     def topological_sort(self):
-        # print('n_nodes: ', self.n_nodes)
-        sorted_nodes = np.zeros(self.n_nodes, int64) * -1
+        """
+        Kahn's algorithm. Nodes on or downstream of cycles are not reached; they are ordered after the sorted nodes
+        by their strongly connected components, in topological order of the components.
+        """
+        indegree = self.in_degree().copy()
+        sorted_nodes = np.zeros(self.n_nodes, int64)
         n_sorted = 0
 
         zero_indegree, n_zero_indegree = self.get_zero_indegree()
 
         while n_zero_indegree > 0:
-            # print(n_zero_indegree)
             node = zero_indegree[n_zero_indegree - 1]
-            # print('zin: ',node)
             sorted_nodes[n_sorted] = node
             n_sorted += 1
-            children_of_node = self.children[node, :]
             n_zero_indegree -= 1
-            for i in range(children_of_node[0]):
-                child = children_of_node[i + 1]
-                self.indegree_map[child] -= 1
-                if self.indegree_map[child] == 0:
+            for k in range(self.out_ptr[node], self.out_ptr[node + 1]):
+                child = self.edges[self.out_edges[k], 1]
+                indegree[child] -= 1
+                if indegree[child] == 0:
                     zero_indegree[n_zero_indegree] = child
                     n_zero_indegree += 1
 
+        self.n_sorted = n_sorted
         if n_sorted < self.n_nodes:
-
-            cd, self.cyclic_path = self.detect_cyclic_graph()
-
-            self.cyclic_dependency = cd
+            self.detect_cyclic_graph(sorted_nodes, indegree)
         else:
             self.cyclic_dependency = -1
+            self.cyclic_path = np.zeros((0,), np.int64)
+            self.component = np.arange(self.n_nodes)
+            self.n_components = self.n_nodes
 
         self.topological_sorted_nodes = sorted_nodes
 
+    def detect_cyclic_graph(self, sorted_nodes, indegree):
+        unsorted = np.flatnonzero(indegree > 0)
+        component, n_components = strongly_connected_components(unsorted, self.edges, self.out_ptr, self.out_edges,
+                                                                self.n_nodes)
+        # Tarjan numbers components in reverse topological order
+        leftover = unsorted[np.argsort(n_components - 1 - component[unsorted], kind='mergesort')]
+        sorted_nodes[self.n_sorted:] = leftover
+
+        # Sorted nodes are components of their own
+        component[sorted_nodes[:self.n_sorted]] = np.arange(n_components, n_components + self.n_sorted)
+        self.component = component
+        self.n_components = n_components + self.n_sorted
+
+        sizes = np.bincount(component[unsorted], minlength=n_components)
+        self.cyclic_dependency = -1
+        for n in leftover:
+            cyclic = sizes[component[n]] > 1
+            for k in range(self.out_ptr[n], self.out_ptr[n + 1]):
+                if self.edges[self.out_edges[k], 1] == n:
+                    cyclic = True
+            if cyclic:
+                self.cyclic_dependency = n
+                self.cyclic_path = find_cycle(n, self.edges, self.out_ptr, self.out_edges, component)
+                break
+
     def get_ancestor_graph(self, n):
         edges = np.zeros_like(self.edges)
         edges_visited = np.zeros(len(self.edges), dtype=int64)
         n_visited = int64(0)
         ix = int64(0)
         dep_derivatives = np.zeros(len(self.edges), dtype=int64)
-        ix, n_visited, deriv_dep = walk_parents(self.parent_edges, self.edges, n, edges, ix, edges_visited, n_visited,
-                                                self.node_types, 0, dep_derivatives)
+        ix, n_visited, deriv_dep = walk_parents(self.in_ptr, self.in_edges, self.edges, n, edges, ix, edges_visited,
+                                                n_visited, self.node_types, 0, dep_derivatives)
         edges = edges[:ix, :]
         edges[:ix, 3] = 1
 
@@ -317,8 +393,8 @@ class _Graph:
         edges_visited = np.zeros(len(self.edges), dtype=int64)
         n_visited = int64(0)
         for n in nodes_:
-            ix, n_visited = walk_children(self.parent_edges, self.children_edges, self.edges, n, edges, ix,
-                                          edges_visited, n_visited, self.node_types)
+            ix, n_visited = walk_children(self.in_ptr, self.in_edges, self.out_ptr, self.out_edges, self.edges, n,
+                                          edges, ix, edges_visited, n_visited, self.node_types)
 
         edges = edges[:ix, :]
         edges[:ix, 3] = 2
@@ -370,16 +446,3 @@ class _Graph:
             edges = anc_edges
 
         return nodes, edges, anc_nodes, anc_edges, deriv_dependencies
-
-    def detect_cyclic_graph(self):
-        zero_indegree, n_zero_indegree = self.get_zero_indegree()
-
-        for i in range(n_zero_indegree):
-            zid = zero_indegree[i]
-            cyclic_dependency, cyclic_path = depth_first_search(zid, np.zeros((0,), dtype=int64), self.children)
-            if cyclic_dependency >= 0:
-                print('cyclic dependency: ', cyclic_dependency)
-                print('cyclic path: ', cyclic_path)
-                return cyclic_dependency, cyclic_path
-
-        return int64(-1), np.zeros((0,), dtype=int64)
@@ -1,4 +1,6 @@
-from numerous.engine.variables import VariableType, SetOfVariables, Variable
+import numpy as np
+
+from numerous.engine.variables import VariableType, SetOfVariables, Variable, place_by_idx
 from numerous.engine.model.graph_representation.utils import EdgeType
 from numerous.engine.model.utils import NodeTypes
 from numerous.utils.string_utils import d_u
@@ -30,6 +32,7 @@ class TemporarySetVar:
     def __init__(self, id, set_var):
         self.id = id
         self.tmp_vars = []
+        self.tmp_vars_by_idx = []
         self.type = VariableType.TMP_PARAMETER_SET
         self.set_var = set_var
         self.size = set_var.size
@@ -38,8 +41,12 @@ class TemporarySetVar:
     def get_size(self):
         return len(self.tmp_vars)
 
+    def add_variable(self, variable):
+        self.tmp_vars.append(variable)
+        place_by_idx(self.tmp_vars_by_idx, variable)
+
     def get_var_by_idx(self, i):
-        return next(var for var in self.tmp_vars if var.set_var_ix == i)
+        return self.tmp_vars_by_idx[i]
 
 
 class SumCount:
@@ -63,9 +70,7 @@ class MappingsGraph(Graph):
         self.vars_assignments_mappings = {}
 
     def variables(self):
-        for n in self.node_map.values():
-            if self.nodes[n].node_type == NodeTypes.VAR:
-                yield n
+        yield from np.flatnonzero(self.nodes_attr['node_type'][:self.node_counter] == NodeTypes.VAR).tolist()
 
     def remove_chains(self):
         for target in self.variables():
@@ -82,12 +87,12 @@ class MappingsGraph(Graph):
                     self.vars_assignments[target] = []
                     self.vars_assignments_mappings[target] = []
 
-                if self.edges_c[edge_ix].e_type == EdgeType.MAPPING:
-                    self.vars_mappings[target] = (edge[0], self.edges_c[edge_ix].mappings)
+                if self.edges_attr['e_type'][edge_ix] == EdgeType.MAPPING:
+                    self.vars_mappings[target] = (edge[0], self.edges_attr['mappings'][edge_ix])
                     self.remove_edge(edge_ix)
 
                 self.vars_assignments[target].append(edge[0])
-                self.vars_assignments_mappings[target].append(self.edges_c[edge_ix].mappings)
+                self.vars_assignments_mappings[target].append(self.edges_attr['mappings'][edge_ix])
 
         for target in self.variables():
             target_edges_indcs, target_edges = self.get_edges_type_for_node_filter(end_node=target,
@@ -118,7 +123,7 @@ class MappingsGraph(Graph):
                             tmp_var_counter += 1
                             svf = TemporaryVar('tmp_var_' + str(tmp_var_counter), svi,
                                                svi.tag + '_' + str(sv.id), svi.set_var, svi.set_var_ix)
-                            tsv.tmp_vars.append(svf)
+                            tsv.add_variable(svf)
                         fake_sv[tsv.id] = tsv
                     else:
                         svf = TemporaryVar(d_u(tmp_key), sv, tmp_key, None, None)
@@ -130,7 +135,7 @@ class MappingsGraph(Graph):
                                              file='sum', label=tmp_label, ln=0, scope_var=svf), ignore_existing=False)
                     # Add temp var to Equation target
 
-                    self.add_edge(Edge(n, tmp, e_type=EdgeType.TARGET, arg_local=self.edges_c[i[0]].arg_local))
+                    self.add_edge(Edge(n, tmp, e_type=EdgeType.TARGET, arg_local=self.edges_attr['arg_local'][i[0]]))
                     # Add temp var in var assignments
 
                     self.vars_assignments_mappings[va][(nix := self.vars_assignments[va].index(n))] = ':'
@@ -3,6 +3,7 @@ import numpy as np
 
 from numerous.engine.model.ast_parser.equation_from_graph import function_from_graph_generic, \
     compiled_function_from_graph_generic_llvm
+from numerous.engine.model.assembly_timer import AssemblyTimer
 from numerous.engine.model.lowering.ast_builder import ASTBuilder
 from numerous.engine.model.graph_representation import EdgeType
 
@@ -14,12 +15,45 @@ from numerous.utils.string_utils import d_u
 from numerous.utils import logger as log
 
 
+def layout_temporary_variables(scope_variables, temporary_variables):
+    """
+    Order of the scope variables with temporary variables. Each variable assigned through a temporary variable is
+    replaced by it, and moved after all other variables, in the order of the temporary variables.
+    """
+    replaced = {}
+    for group, var in enumerate(temporary_variables.values()):
+        if var.type == VariableType.TMP_PARAMETER_SET:
+            for k in var.set_var.variables:
+                replaced[k] = (group, var)
+        elif var.type == VariableType.TMP_PARAMETER:
+            replaced[var.scope_var_id] = (group, var)
+
+    layout = {}
+    tails = [[] for _ in temporary_variables]
+    for k, v in scope_variables.items():
+        if k in replaced:
+            group, var = replaced[k]
+            tmp_var = var.tmp_vars[v.set_var_ix] if var.type == VariableType.TMP_PARAMETER_SET else var
+            layout[tmp_var.id] = tmp_var
+            tails[group].append((k, v))
+        else:
+            layout[k] = v
+    for tail in tails:
+        layout.update(tail)
+    return layout
+
+
 class EquationGenerator:
     def __init__(self, filename, equation_graph, scope_variables, equations,
-                 temporary_variables, system_tag="", use_llvm=True, imports=None, eq_used=None):
+                 temporary_variables, system_tag="", use_llvm=True, imports=None, eq_used=None,
+                 compilation_processes=1, timer=None):
         if eq_used is None:
             eq_used = []
+        if timer is None:
+            timer = AssemblyTimer({})
+        self.timer = timer
         self.filename = filename
+        self.compilation_processes = compilation_processes
         self.imports = imports
         self.system_tag = system_tag
         self.scope_variables = scope_variables
@@ -38,27 +72,10 @@ class EquationGenerator:
         for k, var in temporary_variables.items():
             if var.type == VariableType.TMP_PARAMETER_SET:
                 self.set_variables.update({k: var})
-                new_sv = {}
-                tail = {}
-                for k, v in self.scope_variables.items():
-                    if k in var.set_var.variables:
-                        tail.update({k: v})
-                        new_sv.update({var.tmp_vars[v.set_var_ix].id: var.tmp_vars[v.set_var_ix]})
-                    else:
-                        new_sv.update({k: v})
-                self.scope_variables = dict(new_sv, **tail)
-            if var.type == VariableType.TMP_PARAMETER:
-                new_sv = {}
-                tail = {}
-                for k, v in self.scope_variables.items():
-                    if k == var.scope_var_id:
-                        tail.update({k: v})
-                        new_sv.update({var.id: var})
-                    else:
-                        new_sv.update({k: v})
-                self.scope_variables = dict(new_sv, **tail)
+        self.scope_variables = layout_temporary_variables(self.scope_variables, temporary_variables)
 
         self.temporary_variables = temporary_variables
+        self._index_item_scope()
 
         self.values_order = {}
         self.global_variables = {}
@@ -67,8 +84,10 @@ class EquationGenerator:
         self._parse_variables()
 
         # Sort the graph topologically to start generating code
+        timer.start()
         self.topo_sorted_nodes = equation_graph.topological_nodes()
         self.equation_graph = equation_graph.clean()
+        timer.lap("Topological sort")
 
         self.number_of_states = len(self.states)
         self.number_of_derivatives = len(self.deriv)
@@ -97,6 +116,7 @@ class EquationGenerator:
             if eq_key in eq_used:
                 used_eq[eq_key] = eq
         self._parse_equations(used_eq)
+        timer.lap("Equation compilation")
 
     def _parse_variable(self, full_tag, sv):
         # If a scope_variable is part of a set it should be referenced alone
@@ -133,6 +153,7 @@ class EquationGenerator:
     def _parse_equations(self, equations):
         log.info('Making equations for compilation')
 
+        pending_functions = []
         for eq_key, eq in equations.items():
             vardef = Vardef(eq_key, llvm=self.llvm, exclude_global_var=eq.is_set)
 
@@ -146,9 +167,13 @@ class EquationGenerator:
                     replacements=eq.replacements,
                     replace_name=eq_key
                 )
-                self.llvm_names.update(
-                    self.generated_program.add_external_function(func_llvm, signature, len(args), target_ids,
-                                                                 replacements=eq.replacements, replace_name=eq_key))
+                if self.compilation_processes > 1:
+                    pending_functions.append((func_llvm, signature, len(args), target_ids))
+                else:
+                    self.llvm_names.update(
+                        self.generated_program.add_external_function(func_llvm, signature, len(args), target_ids,
+                                                                     replacements=eq.replacements,
+                                                                     replace_name=eq_key))
 
             else:
                 func, args, target_ids = function_from_graph_generic(eq.graph,
@@ -164,14 +189,32 @@ class EquationGenerator:
             vardef.args_order = args
             self.eq_vardefs[eq_key] = vardef
 
-    def search_in_item_scope(self, var_id, item_id):
-        for var in self.scope_variables.values():
-            ##TODO add namespacecheck
-            if not var.global_var:
-                if var.item.id == item_id and var.tag == self.scope_variables[var_id].tag:
-                    return var.id
+        if pending_functions:
+            log.info(f'Compiling {len(pending_functions)} equations in {self.compilation_processes} processes')
+            self.llvm_names.update(
+                self.generated_program.add_external_functions(pending_functions, self.compilation_processes))
+
+    def _index_item_scope(self):
+        # (item id, tag) -> (position, id) of the first variable with that tag in the item, in scope variable order
+        self.item_scope_index = {}
+        self.first_global_position = len(self.scope_variables)
+        for position, var in enumerate(self.scope_variables.values()):
+            if var.global_var:
+                self.first_global_position = min(self.first_global_position, position)
             else:
-                return var_id
+                self.item_scope_index.setdefault((var.item.id, var.tag), (position, var.id))
+
+    def search_in_item_scope(self, var_id, item_id):
+        ##TODO add namespacecheck
+        # The first variable in scope variable order that is global or has the tag of var_id in the item decides
+        if self.first_global_position == 0:
+            return var_id
+        position, found_id = self.item_scope_index.get((item_id, self.scope_variables[var_id].tag),
+                                                       (len(self.scope_variables), None))
+        if position < self.first_global_position:
+            return found_id
+        if self.first_global_position < len(self.scope_variables):
+            return var_id
         raise ValueError("No variable found for id {}", var_id)
 
     def _process_equation_node(self, n):
@@ -188,20 +231,20 @@ class EquationGenerator:
             self.equation_graph.get_edges_type_for_node_filter(end_node=n, val=EdgeType.ARGUMENT))
         # Determine the local arguments names
         args_local = [self.equation_graph.key_map[ae[0]] for i, ae in zip(a_indcs, a_edges) if
-                      not self.equation_graph.edges_c[i].is_local]
+                      not self.equation_graph.edges_attr['is_local'][i]]
 
         # Determine the local arguments names
-        args_scope_var = [self.equation_graph.edges_c[i].arg_local for i, ae in zip(a_indcs, a_edges) if
-                          not self.equation_graph.edges_c[i].is_local]
+        args_scope_var = [self.equation_graph.edges_attr['arg_local'][i] for i, ae in zip(a_indcs, a_edges) if
+                          not self.equation_graph.edges_attr['is_local'][i]]
 
         # Find the targets by looking for target edges
         t_indcs, t_edges = list(
             self.equation_graph.get_edges_type_for_node_filter(start_node=n, val=EdgeType.TARGET))
         targets_local = [self.equation_graph.key_map[te[1]] for i, te in zip(t_indcs, t_edges) if
-                         not self.equation_graph.edges_c[i].is_local]
-        targets_scope_var = [self.equation_graph.edges_c[i].arg_local for i, ae in zip(t_indcs, t_edges)
+                         not self.equation_graph.edges_attr['is_local'][i]]
+        targets_scope_var = [self.equation_graph.edges_attr['arg_local'][i] for i, ae in zip(t_indcs, t_edges)
                              if
-                             not self.equation_graph.edges_c[i].is_local]
+                             not self.equation_graph.edges_attr['is_local'][i]]
 
         # Record targeted and read variables
         if self.equation_graph.nodes[n].vectorized:
@@ -272,7 +315,7 @@ class EquationGenerator:
             for v_ix, v in zip(v_indcs, value_edges):
                 if (nt := self.equation_graph.nodes[v[0]].node_type) == NodeTypes.VAR or nt == NodeTypes.TMP:
 
-                    if (mix := self.equation_graph.edges_c[v_ix].mappings) == ':':
+                    if (mix := self.equation_graph.edges_attr['mappings'][v_ix]) == ':':
                         mappings[':'].append(self.equation_graph.key_map[v[0]])
 
                     elif isinstance(mix, list):
@@ -285,7 +328,7 @@ class EquationGenerator:
 
                     else:
                         raise ValueError(
-                            f'mapping indices not specified!{self.equation_graph.edges_c[v_ix].mappings}, {self.equation_graph.key_map[t]} <- {self.equation_graph.key_map[v[0]]}')
+                            f'mapping indices not specified!{mix}, {self.equation_graph.key_map[t]} <- {self.equation_graph.key_map[v[0]]}')
 
                 else:
                     raise ValueError(f'this must be a mistake {self.equation_graph.key_map[v[0]]}')
@@ -339,7 +382,7 @@ class EquationGenerator:
                 []]
 
             for v, vi in zip(value_edges, v_indcs):
-                maps = self.equation_graph.edges_c[vi].mappings
+                maps = self.equation_graph.edges_attr['mappings'][vi]
 
                 if maps == ':':
                     if self.equation_graph.key_map[t] in self.set_variables:
@@ -378,6 +421,7 @@ class EquationGenerator:
 
     def generate_equations(self, export_model=False, clonable=False):
         log.info('Generate kernel')
+        self.timer.start()
         # Generate the ast for the python kernel
         for n in self.topo_sorted_nodes:
             # Add the equation calls
@@ -400,11 +444,13 @@ class EquationGenerator:
                 deriv_idx.append(v)
             if k in self.states:
                 state_idx.append(v)
+        self.timer.lap("Kernel generation")
         if self.llvm:
             log.info('Generating llvm')
             diff, var_func, var_write = self.generated_program.generate(imports=self.imports,
                                                                         system_tag=self.system_tag,
                                                                         save_to_file=save_to_file)
+            self.timer.lap("Code generation")
 
             return diff, var_func, var_write, self.values_order, self.scope_variables, np.array(state_idx,
                                                                                                 dtype=np.int64), \
@@ -415,5 +461,6 @@ class EquationGenerator:
             global_kernel, var_func, var_write = self.generated_program.generate(self.imports,
                                                                                  system_tag=self.system_tag,
                                                                                  save_to_file=save_to_file)
+            self.timer.lap("Code generation")
             return global_kernel, var_func, var_write, self.values_order, self.scope_variables, \
                    np.array(state_idx, dtype=np.int64), np.array(deriv_idx, dtype=np.int64)
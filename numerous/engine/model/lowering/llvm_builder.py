@@ -1,5 +1,6 @@
 from __future__ import print_function
 
+import multiprocessing
 import os
 from ctypes import CFUNCTYPE, POINTER, c_double, c_void_p, c_int64
 from typing import Optional, Dict, Callable
@@ -15,12 +16,48 @@ import numpy as np
 
 import llvmlite.ir as ll
 
-from numerous.engine.model.lowering.llvm_initializer import ee, llvm, target_machine
+from numerous.engine.model.lowering.llvm_initializer import llvm, get_execution_engine, get_target_machine, \
+    create_execution_engine
 
 
 LISTING_FILEPATH = "tmp/listings/"
 LISTINGFILENAME = "_llvm_listing.ll"
 
+# Equation functions waiting for compilation. Workers are forked, so they inherit this list instead of
+# pickling generated functions together with their closures.
+_pending_external_functions = []
+
+# Execution engines holding machine code compiled in worker processes. They must stay alive as long as any kernel
+# calling into them.
+_external_engines = []
+
+
+def emit_object_code(llvm_modules: list[str]) -> bytes:
+    """
+    Link LLVM IR modules into one and compile it to native object code for the host.
+    """
+    module = llvm.parse_assembly(llvm_modules[0])
+    for llvm_ir in llvm_modules[1:]:
+        module.link_in(llvm.parse_assembly(llvm_ir))
+    return get_target_machine().emit_object(module)
+
+
+def load_object_code(object_code: bytes):
+    """
+    Load native object code into a new execution engine. Only relocation happens here, no code generation.
+    """
+    engine = create_execution_engine()
+    engine.add_object_file(llvm.ObjectFileRef.from_data(object_code))
+    engine.finalize_object()
+    return engine
+
+
+def _compile_external_function(i: int) -> tuple[str, str, bytes]:
+    function, signature = _pending_external_functions[i]
+    f_c = cfunc(sig=signature)(function)
+    llvm_ir = f_c.inspect_llvm()
+    return f_c.native_name, llvm_ir, get_target_machine().emit_object(llvm.parse_assembly(llvm_ir))
+
 
 class LLVMBuilder:
     """
@@ -38,6 +75,7 @@ class LLVMBuilder:
         """
 
         self.loopcount = 0
+        target_machine = get_target_machine()
         self.detailed_print('Target data: ', target_machine.target_data)
         self.detailed_print('Target triple: ', target_machine.triple)
         self.module = ll.Module()
@@ -114,18 +152,51 @@ class LLVMBuilder:
         name = f_c.native_name
         self.equations_llvm.append(f_c.inspect_llvm())
 
-        f_c_sym = llvm.add_symbol(name, f_c.address)
+        llvm.add_symbol(name, f_c.address)
+        self._declare_external_function(name, number_of_args, target_ids)
+        return {function.__qualname__: name}
+
+    def add_external_functions(self, functions: list[tuple[Callable, str, int, list[int]]],
+                               processes: int) -> Dict[str, str]:
+        """
+        Compile independent equation functions in a pool of forked processes. Workers return the LLVM IR and the
+        object code of each function. Native addresses do not survive the process boundary, so the object code is
+        loaded into an execution engine here and its address registered like in :meth:`add_external_function`.
+        Falls back to sequential compilation where fork is not available.
+        """
+        if processes <= 1 or len(functions) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            names = {}
+            for function, signature, number_of_args, target_ids in functions:
+                names.update(self.add_external_function(function, signature, number_of_args, target_ids))
+            return names
+
+        _pending_external_functions[:] = [(function, signature) for function, signature, _, _ in functions]
+        try:
+            with multiprocessing.get_context('fork').Pool(min(processes, len(functions))) as pool:
+                compiled = pool.map(_compile_external_function, range(len(functions)))
+        finally:
+            _pending_external_functions.clear()
+
+        names = {}
+        for (function, _, number_of_args, target_ids), (name, llvm_ir, object_code) in zip(functions, compiled):
+            self.equations_llvm.append(llvm_ir)
+            engine = load_object_code(object_code)
+            _external_engines.append(engine)
+            llvm.add_symbol(name, engine.get_function_address(name))
+            self._declare_external_function(name, number_of_args, target_ids)
+            names[function.__qualname__] = name
+        return names
+
+    def _declare_external_function(self, name: str, number_of_args: int, target_ids: list[int]):
         llvm_signature = np.tile(ll.DoubleType(), number_of_args).tolist()
         for i in target_ids:
             llvm_signature[i] = ll.DoubleType().as_pointer()
 
         fnty_c_func = ll.FunctionType(ll.VoidType(),
                                       llvm_signature)
-        fnty_c_func.as_pointer(f_c_sym)
         f_llvm = ll.Function(self.module, fnty_c_func, name=name)
 
         self.ext_funcs[name] = f_llvm
-        return {function.__qualname__: name}
 
     def generate(self, imports: Optional[list] = None,
                  system_tag: Optional[str] = None,
@@ -174,6 +245,7 @@ class LLVMBuilder:
         pmb.populate(pm)
         pm.run(llmod)
 
+        ee = get_execution_engine()
         ee.add_module(llmod)
 
         ee.finalize_object()
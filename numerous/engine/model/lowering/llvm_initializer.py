@@ -6,9 +6,34 @@ import os
 NUMEROUS_LLVM_DEBUGGING = os.getenv("NUMEROUS_LLVM_DEBUGGING", 0)
 if NUMEROUS_LLVM_DEBUGGING:
     faulthandler.enable()
-llvm.initialize()
-llvm.initialize_native_target()
-llvm.initialize_native_asmprinter()
-llvmmodule = llvm.parse_assembly("")
-target_machine = llvm.Target.from_default_triple().create_target_machine()
-ee = llvm.create_mcjit_compiler(llvmmodule, target_machine)
\ No newline at end of file
+
+# LLVM targets and the MCJIT engine are created on first use, so importing numerous does not pay for them.
+_target_machine = None
+_ee = None
+
+
+def get_target_machine():
+    global _target_machine
+    if _target_machine is None:
+        llvm.initialize()
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+        _target_machine = llvm.Target.from_default_triple().create_target_machine()
+    return _target_machine
+
+
+def get_execution_engine():
+    global _ee
+    if _ee is None:
+        llvmmodule = llvm.parse_assembly("")
+        _ee = llvm.create_mcjit_compiler(llvmmodule, get_target_machine())
+    return _ee
+
+
+def create_execution_engine():
+    """
+    A new MCJIT engine next to the shared one. An engine owns its target machine, so each gets its own.
+    """
+    get_target_machine()
+    target_machine = llvm.Target.from_default_triple().create_target_machine()
+    return llvm.create_mcjit_compiler(llvm.parse_assembly(""), target_machine)
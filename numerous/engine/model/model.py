@@ -8,7 +8,6 @@ from typing import Optional, Callable
 from ctypes import CFUNCTYPE, c_int64, POINTER, c_double, c_void_p
 
 import numpy as np
-import time
 import uuid
 
 from numba import njit, carray
@@ -16,7 +15,6 @@ import numpy.typing as npt
 from numba.core.registry import CPUDispatcher
 
 from numba.experimental import jitclass
-import pandas as pd
 from numerous.engine.model.aliased_dataframe import AliasedDataFrame
 
 from numerous.engine.model.events import generate_event_action_ast, generate_event_condition_ast, replace_path_strings
@@ -39,11 +37,18 @@ from numerous.engine.model.graph_representation.graph import Graph
 from numerous.engine.model.ast_parser.parser_ast import process_mappings
 
 from numerous.engine.model.lowering.equations_generator import EquationGenerator
+from numerous.engine.model.lowering.llvm_builder import emit_object_code, load_object_code
+from numerous.engine.model.graph_representation.mappings_graph import TemporaryVar
+from numerous.engine.model.model_cache import ModelCache, structure_hash
+from numerous.engine.model.assembly_timer import AssemblyTimer
 from numerous.engine.system import SetNamespace
 
 from numerous.utils import logger as log
 
-from numerous.engine.model.lowering.llvm_initializer import ee, llvm
+from numerous.engine.model.lowering.llvm_initializer import llvm, get_execution_engine
+
+
+NATIVE_EXPORT_EXTENSION = '.numerous_native'
 
 
 class ModelNamespace:
@@ -80,9 +85,9 @@ class ModelNamespace:
         variables_ordered = [None] * len(variables__)
         if self.is_set:
             for i, v in enumerate(variables__):
-                v.detailed_description.variable_idx = i
+                v.variable_idx = i
         for variable in variables__:
-            variables_ordered[variable.detailed_description.variable_idx] = variable
+            variables_ordered[variable.variable_idx] = variable
         return variables_ordered
 
 
@@ -119,13 +124,22 @@ class Model:
                  generate_graph_pdf: bool = False,
                  global_variables: dict = None,
                  export_model: bool = False,
-                 clonable: bool = False):
+                 clonable: bool = False,
+                 use_cache: bool = False,
+                 compilation_processes: int = 1,
+                 export_native: bool = False,
+                 assembly_hook: Callable[[str, dict], None] = None):
 
         self.path_to_variable = {}
         self.generate_graph_pdf = generate_graph_pdf
         self.export_model = export_model
+        self.export_native = export_native
+        self.use_cache = use_cache
+        self.cache_key = None
+        self.compilation_processes = compilation_processes
 
         self.logger_level = logger_level
+        system.update_paths()
         external_mappings_unpacked = system.get_external_mappings()
         self.system_external_mappings = external_mappings_unpacked
         self.is_external_data = True if len(external_mappings_unpacked) else False
@@ -188,7 +202,8 @@ class Model:
         self.scope_to_variables_idx = []
         self.numba_model = None
 
-        self.info = {}
+        self.info = {"Assembly": {}}
+        self.timer = AssemblyTimer(self.info["Assembly"], assembly_hook)
         self.add_global_variable("t", 0.0)
 
         if global_variables:
@@ -251,15 +266,13 @@ class Model:
         -  _flat
         -  _3d
         """
-
-        def __get_mapping__idx(variable):
-            if variable.mapping:
-                return __get_mapping__idx(variable.mapping)
-            else:
-                return variable.idx_in_scope[0]
-
         log.info("Assembling numerous Model")
-        assemble_start = time.time()
+        with self.timer.phase("Total"):
+            self._assemble()
+
+    def _assemble(self):
+        timer = self.timer
+        timer.start()
 
         # 1. Create list of model namespaces
         model_namespaces = {item_id: _ns
@@ -271,6 +284,7 @@ class Model:
         for variables, equation_dict in map(ModelAssembler.namespace_parser, model_namespaces.items()):
             self.equation_dict.update(equation_dict)
             self.variables.update(variables)
+        timer.lap("Namespaces")
 
         mappings = []
         for variable in self.variables.values():
@@ -288,33 +302,6 @@ class Model:
                     sum_mapping.append(_from.id)
                 mappings.append((var.id, sum_mapping))
 
-        self.mappings_graph = Graph(preallocate_items=1000000)
-
-        self.equations_parsed = {}
-
-        log.info('Parsing equations starting')
-
-        eq_used = []
-        for item_id, namespaces in model_namespaces.items():
-            for ns in namespaces:
-                # Key : scope.tag Value: Variable or VariableSet
-                if ns.is_set:
-                    tag_vars = ns.set_variables
-                else:
-                    tag_vars = {v.tag: v for k, v in ns.variables.items()}
-                tag_vars.update(self.global_tag_vars)
-                parse_eq(model_namespace=ns, item_id=item_id, mappings_graph=self.mappings_graph,
-                         variables=tag_vars, parsed_eq_branches=self.equations_parsed, eq_used=eq_used)
-        self.eq_used = eq_used
-        log.info('Parsing equations completed')
-
-        # Process mappings add update the global graph
-        log.info('Process mappings')
-        self.mappings_graph = process_mappings(mappings, self.mappings_graph, self.variables)
-        self.mappings_graph.build_node_edges()
-
-        log.info('Mappings processed')
-
         # Process variables
         states = []
         deriv = []
@@ -342,15 +329,58 @@ class Model:
         self.special_indcs = [self.states_end_ix, self.deriv_end_ix, self.mapping_end_ix]
 
         log.info('Variables sorted')
+        timer.lap("Variables")
+
+        if self.use_cache:
+            restored = self._restore_from_cache(model_namespaces, mappings)
+            timer.lap("Cache lookup")
+            if restored:
+                return
+
+        self.mappings_graph = Graph()
+
+        self.equations_parsed = {}
+
+        log.info('Parsing equations starting')
+
+        eq_used = []
+        eq_signatures = {}
+        for item_id, namespaces in model_namespaces.items():
+            for ns in namespaces:
+                # Key : scope.tag Value: Variable or VariableSet
+                if ns.is_set:
+                    tag_vars = ns.set_variables
+                else:
+                    tag_vars = {v.tag: v for k, v in ns.variables.items()}
+                tag_vars.update(self.global_tag_vars)
+                parse_eq(model_namespace=ns, item_id=item_id, mappings_graph=self.mappings_graph,
+                         variables=tag_vars, parsed_eq_branches=self.equations_parsed, eq_used=eq_used,
+                         eq_signatures=eq_signatures)
+        self.eq_used = eq_used
+        log.info('Parsing equations completed')
+        timer.lap("Parsing equations")
+
+        # Process mappings add update the global graph
+        log.info('Process mappings')
+        self.mappings_graph = process_mappings(mappings, self.mappings_graph, self.variables)
+        self.mappings_graph.build_node_edges()
+
+        log.info('Mappings processed')
+        timer.lap("Process mappings")
 
         self.mappings_graph = MappingsGraph.from_graph(self.mappings_graph)
         self.mappings_graph.remove_chains()
+        timer.lap("Remove chains")
         tmp_vars = self.mappings_graph.create_assignments(self.variables)
+        timer.lap("Create assignments")
         self.mappings_graph.add_mappings()
+        timer.lap("Add mappings")
         if self.generate_graph_pdf:
             self.mappings_graph.as_graphviz(self.system.tag, force=True)
         self.lower_model_codegen(tmp_vars)
+        timer.start()
         self._assembly_tail()
+        timer.lap("Assembly tail")
         self._initial_variables_dict = {k: v.value for k, v in self.variables.items() if not v.global_var}
 
     def _assembly_tail(self):
@@ -444,6 +474,31 @@ class Model:
     def get_variables_initial_values(self):
         return {self.inverse_aliases[k]: v for k, v in self._initial_variables_dict.items()}
 
+    def set_variables_initial_values(self, variables: dict):
+        """
+        Change the initial values of constants, parameters and states of an assembled model without
+        recompiling it. Values are written into the compiled model and become the values restored by
+        :meth:`Simulation.reset`.
+
+        Parameters
+        ----------
+        variables : dict
+            variable path or alias as key, new initial value as value.
+        """
+        init_values = self.init_values.copy()
+        for k, v in variables.items():
+            if k not in self.aliases:
+                raise ValueError(f'Variable {k} is not found in the model')
+            var_id = self.aliases[k]
+            if var_id not in self._initial_variables_dict:
+                raise ValueError(f'Initial value of global variable {k} can not be changed')
+            ix = self.vars_ordered_values[var_id]
+            self.variables[var_id].value = v
+            self._initial_variables_dict[var_id] = v
+            init_values[ix] = v
+            self.var_write(v, ix)
+        self.init_values = init_values
+
     def lower_model_codegen(self, tmp_vars):
 
         log.info('Lowering model')
@@ -452,11 +507,13 @@ class Model:
                                    equation_graph=self.mappings_graph,
                                    scope_variables=self.variables,
                                    temporary_variables=tmp_vars, system_tag=self.system.tag, use_llvm=self.use_llvm,
-                                   imports=self.imports, eq_used=self.eq_used)
+                                   imports=self.imports, eq_used=self.eq_used,
+                                   compilation_processes=self.compilation_processes, timer=self.timer)
 
         compiled_compute, var_func, var_write, self.vars_ordered_values, self.variables, \
             self.state_idx, self.derivatives_idx = \
-            eq_gen.generate_equations(export_model=self.export_model, clonable=self.clonable)
+            eq_gen.generate_equations(export_model=self.export_model or self.export_native or self.cache_key is not None,
+                                      clonable=self.clonable)
 
         for varname, ix in self.vars_ordered_values.items():
             var = self.variables[varname]
@@ -501,17 +558,16 @@ class Model:
 
         self.info.update({"Solver": {}})
         if self.export_model:
-            path = os.environ.get("EXPORT_MODEL_PATH", 'export_model')
-            filename = os.path.join(path, f'{self.system.tag}.numerous')
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            with open(filename, 'wb') as handle:
-                sys.setrecursionlimit(100000)
-                pickle.dump((self.system, self.logger_level,
-                             self.imports, self.use_llvm, self.vars_ordered_values, self.variables,
-                             self.state_idx, self.derivatives_idx, self.init_values, self.aliases,
-                             eq_gen.generated_program.equations_llvm_opt, eq_gen.generated_program.max_var,
-                             eq_gen.generated_program.n_deriv), handle, protocol=pickle.HIGHEST_PROTOCOL)
-            log.info('Model successfully exported to ' + filename)
+            self._export(eq_gen.generated_program.equations_llvm_opt, eq_gen.generated_program.max_var,
+                         eq_gen.generated_program.n_deriv)
+
+        if self.export_native:
+            self._export_native(eq_gen.generated_program.equations_llvm_opt, eq_gen.generated_program.max_var,
+                                eq_gen.generated_program.n_deriv)
+
+        if self.cache_key is not None:
+            self._store_in_cache(eq_gen.generated_program.equations_llvm_opt, eq_gen.generated_program.max_var,
+                                 eq_gen.generated_program.n_deriv)
 
         if self.clonable:
             self.equations_llvm_opt = eq_gen.generated_program.equations_llvm_opt
@@ -529,6 +585,109 @@ class Model:
 
         log.info("Lowering model finished")
 
+    def _export(self, equations_llvm_opt, max_var, n_deriv):
+        path = os.environ.get("EXPORT_MODEL_PATH", 'export_model')
+        filename = os.path.join(path, f'{self.system.tag}.numerous')
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'wb') as handle:
+            sys.setrecursionlimit(100000)
+            pickle.dump((self.system, self.logger_level,
+                         self.imports, self.use_llvm, self.vars_ordered_values, self.variables,
+                         self.state_idx, self.derivatives_idx, self.init_values, self.aliases,
+                         equations_llvm_opt, max_var, n_deriv), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        log.info('Model successfully exported to ' + filename)
+
+    def _model_cache(self):
+        return ModelCache(os.environ.get("MODEL_CACHE_PATH", 'model_cache'))
+
+    def _restore_from_cache(self, model_namespaces, mappings):
+        """
+        Look up the assembled system in the compilation cache and restore the compiled kernel on a hit.
+        Variables are matched to the cached entry by their position in the assembly order, which is part of the key.
+        """
+        if not self.use_llvm:
+            log.info('Compilation cache is only supported for llvm models')
+            return False
+
+        self.cache_key = structure_hash(self, model_namespaces, mappings)
+        self._cache_variables_order = list(self.variables.keys())
+        cached = self._model_cache().load(self.cache_key)
+        self.info.update({"Cache": {"Key": self.cache_key, "Hit": cached is not None}})
+        if cached is None:
+            log.info('Compilation cache miss')
+            return False
+        log.info('Compilation cache hit')
+
+        ids = dict(zip(cached["variables_order"], self._cache_variables_order))
+        variables = {}
+        for var_id, tmp_var in cached["variables"]:
+            if tmp_var is None:
+                variables[ids[var_id]] = self.variables[ids[var_id]]
+            else:
+                tag, scope_var_id, is_set_member = tmp_var
+                svi = self.variables[ids[scope_var_id]]
+                if is_set_member:
+                    variable = TemporaryVar(var_id, svi, '', svi.set_var, svi.set_var_ix)
+                else:
+                    variable = TemporaryVar(var_id, svi, '', None, None)
+                variable.tag = tag
+                variable.logger_level = LoggerLevel.ALL
+                variables[var_id] = variable
+
+        self.variables = variables
+        self.vars_ordered_values = {ids.get(k, k): v for k, v in cached["vars_ordered_values"].items()}
+        self.state_idx = cached["state_idx"]
+        self.derivatives_idx = cached["derivatives_idx"]
+        self.init_values = np.ascontiguousarray([self.variables[k].value for k in self.vars_ordered_values.keys()],
+                                                dtype=np.float64)
+        for varname, ix in self.vars_ordered_values.items():
+            self.variables[varname].llvm_idx = ix
+
+        self._set_functions(cached["equations_llvm_opt"], cached["n_deriv"], cached["max_var"])
+        self.update_all_variables()
+
+        if self.export_model:
+            self._export(cached["equations_llvm_opt"], cached["max_var"], cached["n_deriv"])
+        if self.clonable:
+            self.equations_llvm_opt = cached["equations_llvm_opt"]
+            self.max_var = cached["max_var"]
+            self.n_deriv = cached["n_deriv"]
+
+        self._initial_variables_dict = {k: v.value for k, v in self.variables.items() if not v.global_var}
+        return True
+
+    def _export_native(self, equations_llvm_opt, max_var, n_deriv):
+        path = os.environ.get("EXPORT_MODEL_PATH", 'export_model')
+        filename = os.path.join(path, f'{self.system.tag}{NATIVE_EXPORT_EXTENSION}')
+        object_filename = filename + '.o'
+        os.makedirs(path, exist_ok=True)
+        with open(object_filename, 'wb') as handle:
+            handle.write(emit_object_code(equations_llvm_opt))
+        with open(filename, 'wb') as handle:
+            sys.setrecursionlimit(100000)
+            pickle.dump((self.system, self.logger_level, self.imports, self.vars_ordered_values, self.variables,
+                         self.state_idx, self.derivatives_idx, self.init_values, self.aliases,
+                         os.path.basename(object_filename), max_var, n_deriv), handle,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _store_in_cache(self, equations_llvm_opt, max_var, n_deriv):
+        variables = []
+        for var_id, var in self.variables.items():
+            if var.temporary_variable:
+                variables.append((var_id, (var.tag, var.scope_var_id, var.set_var is not None)))
+            else:
+                variables.append((var_id, None))
+
+        self._model_cache().store(self.cache_key, {"variables_order": self._cache_variables_order,
+                                                   "variables": variables,
+                                                   "vars_ordered_values": self.vars_ordered_values,
+                                                   "state_idx": self.state_idx,
+                                                   "derivatives_idx": self.derivatives_idx,
+                                                   "equations_llvm_opt": equations_llvm_opt,
+                                                   "max_var": max_var,
+                                                   "n_deriv": n_deriv})
+        log.info('Model stored in compilation cache')
+
     def generate_path_to_varaible(self):
         for k, v in self.aliases.items():
             self.path_to_variable[k] = self.variables[v]
@@ -560,6 +719,7 @@ class Model:
         for i, var in enumerate(self.var_list):
             data.update({var: self.data[i + 1]})
 
+        import pandas as pd
         self.df = pd.DataFrame(data)
         self.df = self.df.dropna(subset=['time'])
         self.df = self.df.set_index('time')
@@ -741,6 +901,7 @@ class Model:
         # Creating a copy of CompiledModel class so it is possible
         # to creat instance detached from muttable type of CompiledModel
         tmp = type(f'{CompiledModel.__name__}' + self.system.id, CompiledModel.__bases__, dict(CompiledModel.__dict__))
+        self.timer.start()
         if self.use_llvm:
             @jitclass(numba_model_spec)
             class CompiledModel_instance(tmp):
@@ -769,6 +930,7 @@ class Model:
                                              self.external_idx,
                                              self.post_step
                                              )
+        self.timer.lap("Compiled model")
 
         # NM_instance.run_init_callbacks(start_time)
         NM_instance.map_external_data(start_time)
@@ -778,10 +940,14 @@ class Model:
         return self.numba_model
 
     def _set_functions(self, equations_llvm_opt, n_deriv, max_var):
+        ee = get_execution_engine()
         for equation in equations_llvm_opt:
             llmod2 = llvm.parse_assembly(equation)
             ee.add_module(llmod2)
         ee.finalize_object()
+        self._bind_kernel(ee, n_deriv, max_var)
+
+    def _bind_kernel(self, ee, n_deriv, max_var):
         cfptr = ee.get_function_address("kernel")
 
         cfptr_var_r = ee.get_function_address("vars_r")
@@ -935,6 +1101,30 @@ class Model:
         model._set_functions(equations_llvm_opt, n_deriv, max_var)
         return model
 
+    @classmethod
+    def from_native_file(cls, filename: str):
+        """
+        Restore a model exported with ``export_native=True``. The kernel and equations are loaded as native object
+        code, so no LLVM optimisation or code generation runs before the first step.
+        """
+        with open(filename, 'rb') as handle:
+            system_, logger_level, imports, vars_ordered_values, variables, state_idx, derivatives_idx, \
+                init_values, aliases, object_filename, max_var, n_deriv = pickle.load(handle)
+        with open(os.path.join(os.path.dirname(filename), object_filename), 'rb') as handle:
+            object_code = handle.read()
+        model = Model(system=system_, assemble=False, logger_level=logger_level, use_llvm=True)
+        model.variables = variables
+        model.imports = imports
+        model.vars_ordered_values = vars_ordered_values
+        model.state_idx = state_idx
+        model.derivatives_idx = derivatives_idx
+        model.init_values = init_values
+        model.aliases = aliases
+
+        model._native_engine = load_object_code(object_code)
+        model._bind_kernel(model._native_engine, n_deriv, max_var)
+        return model
+
     def clone(self, clonable=False):
 
         if not self.clonable:
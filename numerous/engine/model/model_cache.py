@@ -0,0 +1,114 @@
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import sys
+import types
+
+import numpy as np
+
+CACHE_FORMAT_VERSION = 1
+CACHE_FILE_EXTENSION = '.numerous_cache'
+
+_self_attribute = re.compile(r"self\.(\w+)")
+
+
+def _describe_value(value):
+    """
+    Deterministic description of a value baked into generated code. Objects without a stable
+    representation fall back to repr, which includes the object address and therefore never produces a false hit.
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    if isinstance(value, np.ndarray):
+        return f'ndarray:{value.dtype}:{value.shape}:{hashlib.sha256(value.tobytes()).hexdigest()}'
+    if isinstance(value, (tuple, list)):
+        return '(' + ','.join(_describe_value(v) for v in value) + ')'
+    if isinstance(value, types.ModuleType):
+        return f'module:{value.__name__}'
+    py_func = getattr(value, 'py_func', value)
+    code = getattr(py_func, '__code__', None)
+    if code is not None:
+        return f'function:{py_func.__module__}.{py_func.__qualname__}:' \
+               f'{hashlib.sha256(code.co_code + repr(code.co_consts).encode()).hexdigest()}'
+    return repr(value)
+
+
+def _equation_description(eq):
+    description = [eq.name, eq.lines]
+    instance = getattr(eq, '__self__', None)
+    if instance is not None:
+        for attr in sorted(set(_self_attribute.findall(eq.lines))):
+            description.append(attr + '=' + _describe_value(getattr(instance, attr, None)))
+    try:
+        func = inspect.getclosurevars(eq).nonlocals['func']
+        closure_globals = inspect.getclosurevars(func).globals
+    except (KeyError, TypeError, ValueError):
+        closure_globals = {}
+    for name in sorted(closure_globals):
+        description.append(name + ':' + _describe_value(closure_globals[name]))
+    return description
+
+
+def _variable_description(variable, system_id):
+    return [variable.path.path.get(system_id, [variable.tag]), variable.tag, variable.type.name,
+            variable.logger_level.name if variable.logger_level is not None else None,
+            variable.global_var, variable.global_var_idx, variable.alias,
+            variable.set_var.tag if variable.set_var is not None else None, variable.set_var_ix]
+
+
+def structure_hash(model, model_namespaces: dict, mappings: list) -> str:
+    """
+    Content hash of everything that determines the generated kernel: equation sources and the values they close
+    over, mappings, set layout, variable order and types, logger levels and tool versions. Initial values are not
+    part of the key, they are written into the restored kernel after loading.
+    """
+    import llvmlite
+    import numba
+
+    position = {var_id: i for i, var_id in enumerate(model.variables)}
+    structure = [CACHE_FORMAT_VERSION, sys.version, numba.__version__, llvmlite.__version__,
+                 model.logger_level.name, model.use_llvm, model.imports.as_imports, model.imports.from_imports]
+
+    structure.append([_variable_description(v, model.system.id) for v in model.variables.values()])
+
+    for namespaces in model_namespaces.values():
+        for ns in namespaces:
+            structure.append([ns.full_tag, ns.is_set, len(ns.item_indcs)])
+            for eq_tag, equations in ns.equation_dict.items():
+                structure.append([eq_tag] + [_equation_description(eq) for eq in equations])
+
+    structure.append([(position[target], [position[source] for source in sources]) for target, sources in mappings])
+
+    return hashlib.sha256(repr(structure).encode()).hexdigest()
+
+
+class ModelCache:
+    """
+    On-disk store of compiled models, addressed by :func:`structure_hash`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _filename(self, key: str) -> str:
+        return os.path.join(self.path, key + CACHE_FILE_EXTENSION)
+
+    def load(self, key: str):
+        filename = self._filename(key)
+        if not os.path.exists(filename):
+            return None
+        try:
+            with open(filename, 'rb') as handle:
+                return pickle.load(handle)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def store(self, key: str, payload: dict):
+        os.makedirs(self.path, exist_ok=True)
+        filename = self._filename(key)
+        tmp_filename = filename + '.' + str(os.getpid())
+        with open(tmp_filename, 'wb') as handle:
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filename, filename)
@@ -32,6 +32,11 @@ class ExternalMapping:
 
         self.external_mappings_numpy = np.array(self.external_mappings_numpy, dtype=np.float64)
         self.external_mappings_time = np.array(self.external_mappings_time, dtype=np.float64)
+        # column -> [(dataframe index, column index, interpolation type)] for every dataframe with that column
+        self.column_locations = {}
+        for i, (columns, interpolation_types) in enumerate(zip(self.external_columns, self.interpolation_type)):
+            for index, (column, interpolation_type) in enumerate(zip(columns, interpolation_types)):
+                self.column_locations.setdefault(column, []).append((i, index, interpolation_type))
         self.interpolation_type = [item for sublist in self.interpolation_type for item in sublist]
         self.external_df_idx = []
         self.interpolation_info = []
@@ -69,22 +74,23 @@ class ExternalMapping:
         self.external_df_idx = np.array(self.external_df_idx, dtype=np.int64)
         self.interpolation_info = np.array(self.interpolation_info, dtype=np.bool)
 
+    def _locate(self, variables, var_id, system_id):
+        return {location for path in variables[var_id].path.path[system_id]
+                for location in self.column_locations.get(path, [])}
+
     def add_df_idx(self, variables, var_id, system_id):
-        for i, external_column in enumerate(self.external_columns):
-            for path in variables[var_id].path.path[system_id]:
-                for index, column in enumerate(external_column):
-                    if column in path:
-                        self.external_df_idx.append((i, index))
-                        self.interpolation_info.append(
-                            self.interpolation_type[index].value == InterpolationType.LINEAR.value)
+        locations = self._locate(variables, var_id, system_id)
+        if len(locations) > 1:
+            raise ValueError(f'Variable {variables[var_id].get_path_dot()} is mapped to more than one external '
+                             f'column: {sorted((i, index) for i, index, _ in locations)} (dataframe, column)')
+        for i, index, interpolation_type in locations:
+            self.external_df_idx.append((i, index))
+            self.interpolation_info.append(interpolation_type.value == InterpolationType.LINEAR.value)
 
     def is_mapped_var(self, variables, var_id, system_id):
         if not variables[var_id].global_var:
-            for path in variables[var_id].path.path[system_id]:
-                for columns in self.external_columns:
-                    for column in columns:
-                        if column == path:
-                            return True
+            if self._locate(variables, var_id, system_id):
+                return True
 
 
 class ExternalMappingElement:
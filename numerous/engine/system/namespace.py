@@ -192,18 +192,19 @@ class SetNamespace(VariableNamespace):
         super().__init__(item, tag)
         self.tag = tag
         self.items_id = item_indcs
+        self.items_ix = {item_id: ix for ix, item_id in enumerate(item_indcs)}
         self.items = []
         self.len_items = len(self.items)
         self.set_variables = {}
 
     def add_item(self, item, ns):
         self.items.append(item)
-        item_ix = self.items_id.index(ns.item.id)
+        item_ix = self.items_ix[ns.item.id]
         for variable in ns.variables:
             if variable.tag not in self.set_variables.keys():
                 self.set_variables[variable.tag] = SetOfVariables(variable.tag, self.item.tag, ns.tag)
-            self.set_variables[variable.tag].add_variable(variable)
             variable.set_var_ix = item_ix
+            self.set_variables[variable.tag].add_variable(variable)
 
     def get_flat_variables(self):
         flat_variables = []
@@ -213,9 +214,25 @@ class SetNamespace(VariableNamespace):
 
 
 class _BindingVariable(Variable):
+    """
+    A view of a variable registered in a binding namespace. All attributes are read from and written to the variable.
+    """
+    __slots__ = ('variable',)
+
     def __init__(self, variable):
-        super().__init__(variable.detailed_description)
-        self.__dict__ = variable.__dict__
+        object.__setattr__(self, 'variable', variable)
+
+    def __getattr__(self, name):
+        # only called for the slots of Variable, which are never set on the view
+        if name == 'variable':
+            raise AttributeError(name)
+        return getattr(self.variable, name)
+
+    def __setattr__(self, name, value):
+        if name == 'variable':
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.variable, name, value)
 
 
 class _ShadowVariableNamespace(VariableNamespaceBase):
@@ -8,7 +8,6 @@ from numerous.engine.system.external_mappings import ExternalMappingUnpacked
 from numerous.multiphysics import EquationBase
 from numerous.utils.dict_wrapper import _DictWrapper
 from numerous.engine.system.item import Item
-import networkx as nx
 from numerous.engine.system.connector_item import ConnectorItem
 from numerous.engine.system.namespace import SetNamespace
 
@@ -29,6 +28,8 @@ class Subsystem(ConnectorItem):
     def __init__(self, tag, external_mappings=None, data_loader=None, run_after_solve=None, post_step=None):
         self.ports = _DictWrapper({}, Item)
         self.registered_items = {}
+        # registered items by tag
+        self.registered_tags = {}
         self.run_after_solve = run_after_solve if run_after_solve is not None else []
         self.post_step = post_step if post_step is not None else []
         self.external_mappings = ExternalMappingUnpacked(external_mappings, data_loader) if external_mappings else None
@@ -70,11 +71,8 @@ class Subsystem(ConnectorItem):
         current_item = item_path.get_top_item()
         next_item_path = item_path.get_next_item_path()
         if self.tag == current_item and next_item_path:
-            for item in self.registered_items.values():
-                if item.tag == next_item_path.get_top_item():
-                    return item.get_item(next_item_path)
-            else:
-                return None
+            item = self.registered_tags.get(next_item_path.get_top_item())
+            return item.get_item(next_item_path) if item is not None else None
         elif self.tag == current_item and next_item_path is None:
             return self
         else:
@@ -105,6 +103,7 @@ class Subsystem(ConnectorItem):
 
     def get_graph_visualisation(self, DG=None, parent=None):
         if DG is None:
+            import networkx as nx
             DG = nx.DiGraph()
         DG.add_node(self.tag)
         if parent:
@@ -142,6 +141,20 @@ class Subsystem(ConnectorItem):
             for item_ in item.registered_items.values():
                 item.update_variables_path(item_, tail + [self])
 
+    def update_paths(self):
+        """
+        Create the variable path hierarchy of all items registered in the subsystem and its nested subsystems.
+
+        Registering an item does not update variable paths, they are created by this method once the system is
+        complete. It is called when a :class:`numerous.engine.model.Model` is created, and calling it again only adds
+        the paths of items registered since.
+        """
+        for item in self.registered_items.values():
+            if isinstance(item, Subsystem):
+                item.update_paths()
+        for item in self.registered_items.values():
+            self.update_variables_path(item)
+
     def register_item(self, item):
         """
 
@@ -150,11 +163,11 @@ class Subsystem(ConnectorItem):
         item : :class:`numerous.engine.system.Item`
             Item to register in the subsystem.
         """
-        if item.tag in [x.tag for x in self.registered_items.values()]:
+        if item.tag in self.registered_tags:
             raise ValueError('Item with tag {} is already registered in system {}'.format(item.tag, self.tag))
         item._increase_level()
-        self.update_variables_path(item)
         self.registered_items.update({item.id: item})
+        self.registered_tags[item.tag] = item
 
     def _find_variable(self, item, varname):
         variables = item.get_variables()
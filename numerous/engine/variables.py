@@ -52,6 +52,8 @@ class DetailedVariableDescription(VariableDescription):
 
 
 class MappedValue(object):
+    __slots__ = ('id', 'mapping', 'sum_mapping', 'special_mapping', 'addself', 'logger_level', 'model', 'llvm_idx')
+
     def __init__(self, id):
         self.id = str(id).replace("-", "_")
         self.mapping = None
@@ -111,24 +113,36 @@ class MappedValue(object):
 
 
 class VariablePath:
+    __slots__ = ('path', 'primary_path', 'used_id_pairs')
 
     def __init__(self, tag, id):
         self.path = {id: tag}
         self.primary_path = tag
-        self.used_id_pairs = []
+        self.used_id_pairs = set()
 
     def __iter__(self):
         return iter(self.path.values())
 
     def extend_path(self, current_id, new_id, new_tag):
-        if not (current_id + new_id in self.used_id_pairs):
+        if (current_id, new_id) not in self.used_id_pairs:
             if new_id in self.path:
                 self.path[new_id].extend([new_tag + '.' + x for x in self.path[current_id]])
                 self.primary_path = new_tag + '.' + self.path[current_id][-1]
             else:
                 self.path.update({new_id: [new_tag + '.' + x for x in self.path[current_id]]})
                 self.primary_path = new_tag + '.' + self.path[current_id][-1]
-            self.used_id_pairs.append(current_id + new_id)
+            self.used_id_pairs.add((current_id, new_id))
+
+
+def place_by_idx(variables_by_idx: list, variable):
+    """
+    Store a member of a set at its set_var_ix in a list of members.
+    """
+    if variable.set_var_ix is None:
+        raise ValueError(f'Variable {variable.id} has no index in its set')
+    if variable.set_var_ix >= len(variables_by_idx):
+        variables_by_idx.extend([None] * (variable.set_var_ix + 1 - len(variables_by_idx)))
+    variables_by_idx[variable.set_var_ix] = variable
 
 
 class SetOfVariables:
@@ -144,6 +158,8 @@ class SetOfVariables:
         self.global_var = False
         self.global_var_idx = False
         self.eq_used = []
+        # members by their set_var_ix
+        self.variables_by_idx = []
 
     def get_size(self):
         return self.size
@@ -164,25 +180,29 @@ class SetOfVariables:
         if variable.mapping:
             self.mapping.append(variable.mapping)
         self.size += 1
+        place_by_idx(self.variables_by_idx, variable)
 
     def get_var_by_idx(self, i):
-        return next(var for var in self.variables.values() if var.set_var_ix == i)
+        return self.variables_by_idx[i]
 
     def __iter__(self):
         return iter(self.variables.values())
 
 
 class Variable(MappedValue):
+    # Variables are created per item and namespace, so they are slotted and keep only the fields of their description
+    # that are used after creation. write_variable is set on the instance once the variable is bound to a model.
+    __slots__ = ('namespace', 'tag', 'type', 'path', 'global_var', 'global_var_idx', 'alias', 'set_var', 'set_var_ix',
+                 'set_namespace', 'size', 'temporary_variable', '_value', 'item', 'metadata', 'update_counter',
+                 'allow_update', 'variable_idx', 'eq_used', 'top_item', 'used_in_equation_graph', 'write_variable')
 
     def __init__(self, detailed_variable_description, base_variable=None):
 
         super().__init__(detailed_variable_description.id)
-        self.detailed_description = detailed_variable_description
         self.namespace = detailed_variable_description.namespace
         self.tag = detailed_variable_description.tag
         self.type = detailed_variable_description.type
         self.path = VariablePath([detailed_variable_description.tag], self.id)
-        self.paths = []
         self.global_var = detailed_variable_description.global_var
         self.global_var_idx = detailed_variable_description.global_var_idx
         self.alias = None
@@ -202,8 +222,7 @@ class Variable(MappedValue):
         self.update_counter = detailed_variable_description.update_counter
         self.allow_update = detailed_variable_description.allow_update
         self.logger_level = detailed_variable_description.logger_level
-        self.associated_scope = []
-        self.idx_in_scope = []
+        self.variable_idx = detailed_variable_description.variable_idx
         self.eq_used = []
         self.top_item = None
         self.used_in_equation_graph = False
@@ -268,12 +287,10 @@ class Variable(MappedValue):
                                                     global_var_idx=global_var_idx))
 
     def empty_variable(self):
-        self.detailed_description = None
         self.namespace = None
         self.tag = None
         self.type = None
         self.path = None
-        self.paths = None
         self.global_var = None
         self.global_var_idx = None
         self.alias = None
@@ -289,8 +306,7 @@ class Variable(MappedValue):
         self.update_counter = None
         self.allow_update = None
         self.logger_level = None
-        self.associated_scope = None
-        self.idx_in_scope = None
+        self.variable_idx = 0
         self.top_item = None
         self.used_in_equation_graph = False
         self.value = 0
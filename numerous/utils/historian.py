@@ -1,5 +1,8 @@
 import os
-import pandas
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas
 
 
 class Historian:
@@ -28,7 +31,7 @@ class Historian:
         else:
             return self.max_size
 
-    def store(self, df: pandas.DataFrame):
+    def store(self, df: 'pandas.DataFrame'):
         """
           Stores the simulation results of the historian.
 
@@ -60,7 +63,7 @@ class LocalHistorian(Historian):
         super().__init__(max_size)
         self.filename = filename
 
-    def store(self, df: pandas.DataFrame):
+    def store(self, df: 'pandas.DataFrame'):
         """
 
         Stores the simulation results of the historian, into  csv file.
@@ -0,0 +1,51 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+# Ids are random uuids unless NUMEROUS_DETERMINISTIC_IDS is set or deterministic ids are switched on at runtime.
+_deterministic = bool(os.getenv("NUMEROUS_DETERMINISTIC_IDS", 0))
+_counters = {}
+
+
+def unique_id(prefix: str = '', uuid_factory=uuid.uuid4) -> str:
+    """
+    Unique id starting with `prefix`.
+
+    By default the id is `prefix` followed by a uuid made by `uuid_factory`. With deterministic ids it is `prefix`
+    followed by the number of ids created with the same prefix before it, so a system built in the same order gets
+    the same ids in every process.
+    """
+    if not _deterministic:
+        return prefix + str(uuid_factory())
+    # the counter always follows an underscore, so ids of different prefixes cannot collide
+    if prefix and not prefix.endswith('_'):
+        prefix += '_'
+    count = _counters.get(prefix, 0)
+    _counters[prefix] = count + 1
+    return prefix + str(count)
+
+
+def use_deterministic_ids(enabled: bool = True):
+    """
+    Switch deterministic ids on or off for objects created from now on, and restart the counters.
+
+    Restarting the counters while objects created with deterministic ids are still in use can give new objects the
+    same ids. Namespace ids are created when numerous is imported, set the NUMEROUS_DETERMINISTIC_IDS environment
+    variable to make those deterministic as well.
+    """
+    global _deterministic
+    _deterministic = enabled
+    _counters.clear()
+
+
+@contextmanager
+def deterministic_ids():
+    """
+    Create the objects of the block with deterministic ids, restarting the counters on entry.
+    """
+    enabled = _deterministic
+    use_deterministic_ids(True)
+    try:
+        yield
+    finally:
+        use_deterministic_ids(enabled)
@@ -54,3 +54,14 @@ def test_simple_set_model(use_llvm):
         assert approx(s.model.historian_df['system.SET_simples.simple'+ str(i) +'.mechanics.x'][100], rel=0.01) ==\
                s.model.historian_df['system.SET_simples.simple' + str(i) + '.mechanics.k'][100]
 
+
+
+def test_set_variables_indexed_by_item():
+    subsystem = SimpleSystem('system', n=5, x0=[0] * 5)
+    items_set, = subsystem.registered_items.values()
+    set_var = items_set.registered_namespaces['mechanics'].set_variables['x']
+    assert set_var.get_size() == 5
+    for i in range(5):
+        var = set_var.get_var_by_idx(i)
+        assert var.set_var_ix == i
+        assert var.item.tag == 'simple' + str(i)
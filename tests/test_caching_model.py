@@ -77,3 +77,55 @@ def test_caching_model(monkeypatch, tmpdir):
     assert all(s1.model.states_as_vector == s2.model.states_as_vector)
 
 
+
+
+def test_native_export(monkeypatch, tmpdir):
+    system = S2N("S2", 2)
+    monkeypatch.setenv("EXPORT_MODEL_PATH", str(tmpdir))
+
+    model = Model(system, export_native=True)
+    s1 = Simulation(model, t_start=0, t_stop=2, num=2)
+    s1.solve()
+    assert os.path.exists(os.path.join(tmpdir, "S2.numerous_native.o"))
+    native_model = Model.from_native_file(os.path.join(tmpdir, "S2.numerous_native"))
+
+    s2 = Simulation(native_model, t_start=0, t_stop=2, num=2)
+    s2.solve()
+    assert all(s1.model.states_as_vector == s2.model.states_as_vector)
+
+
+def test_compilation_cache(monkeypatch, tmpdir):
+    monkeypatch.setenv("MODEL_CACHE_PATH", str(tmpdir))
+
+    model = Model(S2N("S2", 2), use_cache=True)
+    assert not model.info["Cache"]["Hit"]
+    s1 = Simulation(model, t_start=0, t_stop=2, num=2)
+    s1.solve()
+
+    cached_model = Model(S2N("S2", 2), use_cache=True)
+    assert cached_model.info["Cache"]["Hit"]
+    assert cached_model.info["Cache"]["Key"] == model.info["Cache"]["Key"]
+    s2 = Simulation(cached_model, t_start=0, t_stop=2, num=2)
+    s2.solve()
+    assert all(s1.model.states_as_vector == s2.model.states_as_vector)
+    assert all(s1.model.historian_df['S2.2.t1.T'] == s2.model.historian_df['S2.2.t1.T'])
+
+
+def test_compilation_cache_miss_on_structure_change(monkeypatch, tmpdir):
+    monkeypatch.setenv("MODEL_CACHE_PATH", str(tmpdir))
+
+    model = Model(S2N("S2", 2), use_cache=True)
+    other_model = Model(S2N("S2", 3), use_cache=True)
+    assert not other_model.info["Cache"]["Hit"]
+    assert other_model.info["Cache"]["Key"] != model.info["Cache"]["Key"]
+
+
+def test_compilation_cache_uses_current_values(monkeypatch, tmpdir):
+    monkeypatch.setenv("MODEL_CACHE_PATH", str(tmpdir))
+
+    Model(S2N("S2", 2), use_cache=True)
+    system = S2N("S2", 2)
+    system.registered_items[list(system.registered_items)[1]].t1.T.value = 3.0
+    cached_model = Model(system, use_cache=True)
+    assert cached_model.info["Cache"]["Hit"]
+    assert cached_model.get_variables()['S2.2.t1.T'] == 3.0
@@ -2,6 +2,7 @@ import pytest
 import numpy as np
 from pytest import approx
 from numerous.engine.model import Model
+from numerous.engine.model.events import find_variable
 from numerous.engine.simulation import Simulation
 from numerous.engine.system import Subsystem
 from numerous.utils.logger_levels import LoggerLevel
@@ -450,4 +451,14 @@ def test_item_event_condition_direct_slicing(use_llvm):
 
     m1 = Model(system, use_llvm=use_llvm)
     sim = Simulation(m1, t_start=0, t_stop=5, num=100)
-    sim.solve()
\ No newline at end of file
+    sim.solve()
+
+def test_find_variable_relative_to_item_path():
+    path_to_variable = {'system.ball.t1.x': 'item x', 'system.t1.x': 'system x', 't1.v': 'absolute v'}
+
+    assert find_variable(path_to_variable, 'system.ball.', 't1.x') == 'item x'
+    assert find_variable(path_to_variable, 'system.', 't1.x') == 'system x'
+    assert find_variable(path_to_variable, 'system.', 'ball.t1.x') == 'item x'
+    assert find_variable(path_to_variable, 'system.ball.', 't1.v') == 'absolute v'
+    assert find_variable(path_to_variable, '.', 'system.t1.x') == 'system x'
+    assert find_variable(path_to_variable, 'system.ball.', 'system.ball.t1.x') is None
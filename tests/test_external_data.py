@@ -4,8 +4,9 @@ import shutil
 import os.path
 import pandas as pd
 import numpy as np
+from types import SimpleNamespace
 
-from numerous.engine.system.external_mappings import ExternalMappingElement
+from numerous.engine.system.external_mappings import ExternalMappingElement, ExternalMapping, ExternalMappingUnpacked
 from numerous.utils.data_loader import InMemoryDataLoader, CSVDataLoader
 from numerous.utils.historian import InMemoryHistorian
 from numerous.engine.system.external_mappings.interpolation_type import InterpolationType
@@ -487,3 +488,29 @@ def test_get_external_system_fix(use_llvm, external_data: external_data):
         Model(system_outer, use_llvm=use_llvm),
         t_start=0, t_stop=tmax, num=len(np.arange(0, tmax, dt_eval)), max_step=0.1)
     s.solve()
+
+
+def test_external_mapping_matches_exact_column():
+    df = pd.DataFrame({'time': np.arange(3), 'a': np.arange(3), 'b': np.arange(3)})
+    aliases_1 = {'system.t1.x': ('a', InterpolationType.PIESEWISE),
+                 'system.t1.x_think_not': ('b', InterpolationType.LINEAR)}
+    aliases_2 = {'system.t1.y': ('a', InterpolationType.PIESEWISE),
+                 'system.t1.x': ('b', InterpolationType.LINEAR)}
+    external_mapping = ExternalMapping([ExternalMappingUnpacked(
+        [ExternalMappingElement('inmemory', 'time', 0, 1, aliases_1),
+         ExternalMappingElement('inmemory', 'time', 0, 1, aliases_2)], InMemoryDataLoader(df))])
+
+    def variable(path):
+        return SimpleNamespace(global_var=False, path=SimpleNamespace(path={'s': [path]}),
+                               get_path_dot=lambda: path)
+
+    variables = {'x': variable('system.t1.x'), 'x_think_not': variable('system.t1.x_think_not'),
+                 'y': variable('system.t1')}
+
+    assert external_mapping.is_mapped_var(variables, 'x_think_not', 's')
+    assert not external_mapping.is_mapped_var(variables, 'y', 's')
+    external_mapping.add_df_idx(variables, 'x_think_not', 's')
+    assert external_mapping.external_df_idx == [(0, 1)]
+    assert external_mapping.interpolation_info == [True]
+    with pytest.raises(ValueError, match="more than one external column"):
+        external_mapping.add_df_idx(variables, 'x', 's')
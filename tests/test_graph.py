@@ -0,0 +1,81 @@
+import numpy as np
+
+from numerous.engine.model.graph_representation import Graph, Node, Edge, EdgeType
+from numerous.engine.model.utils import NodeTypes
+
+
+def chain_graph():
+    g = Graph()
+    var = g.add_node(Node(key='var', node_type=NodeTypes.VAR))
+    eq = g.add_node(Node(key='eq', node_type=NodeTypes.EQUATION))
+    target = g.add_node(Node(key='target', node_type=NodeTypes.VAR))
+    g.add_edge(Edge(var, eq, e_type=EdgeType.ARGUMENT, arg_local='x'))
+    g.add_edge(Edge(eq, target, e_type=EdgeType.TARGET, mappings=[(0, 0)]))
+    return g, var, eq, target
+
+
+def test_edge_attributes_stored_as_columns():
+    g, var, eq, target = chain_graph()
+    assert g.edges_attr['e_type'][:g.edge_counter].tolist() == [EdgeType.ARGUMENT, EdgeType.TARGET]
+    assert g.edges_attr['arg_local'] == ['x', None]
+    assert g.get_where_node_attr('node_type', NodeTypes.VAR) == [var, target]
+
+    ix, edges = g.get_edges_type_for_node_filter(end_node=target, val=EdgeType.TARGET)
+    assert ix == [1]
+    assert np.all(edges[0] == [eq, target])
+
+
+def test_clone_does_not_share_edge_state():
+    g, var, eq, target = chain_graph()
+    clone = g.clone()
+    clone.remove_edge(1)
+    clone.edges_attr['mappings'][1].append((1, 1))
+    clone.remove_node(var)
+
+    assert g.get_edges_type_for_node_filter(end_node=target, val=EdgeType.TARGET)[0] == [1]
+    assert clone.get_edges_type_for_node_filter(end_node=target, val=EdgeType.TARGET)[0] == []
+    assert g.edges_attr['mappings'][1] == [(0, 0)]
+    assert g.get_where_node_attr('node_type', NodeTypes.VAR) == [var, target]
+    assert clone.get_where_node_attr('node_type', NodeTypes.VAR) == [target]
+
+
+def test_edge_index_follows_added_edges():
+    g, var, eq, target = chain_graph()
+    g.build_node_edges()
+    assert g.in_edges(target).tolist() == [1]
+
+    other = g.add_node(Node(key='other', node_type=NodeTypes.EQUATION))
+    g.add_edge(Edge(other, target, e_type=EdgeType.TARGET))
+    g.add_edge(Edge(var, other, e_type=EdgeType.ARGUMENT))
+    assert g.in_edges(target).tolist() == [1, 2]
+    assert g.out_edges(var, e_type=EdgeType.ARGUMENT).tolist() == [0, 3]
+    assert len(g.has_edge_for_nodes(start_node=other, end_node=target)) == 1
+    assert g.zero_in_degree() == [var]
+
+    g.remove_edge(1)
+    assert g.in_edges(target, e_type=EdgeType.TARGET).tolist() == [2]
+    assert [e.tolist() for _, e in g.get_edges_for_node(end_node=target)] == [[eq, target], [other, target]]
+
+
+def test_graph_grows_past_preallocation():
+    g = Graph(preallocate_items=2)
+    nodes = [g.add_node(Node(key=f'n{i}', node_type=NodeTypes.VAR)) for i in range(5)]
+    for start, end in zip(nodes[:-1], nodes[1:]):
+        g.add_edge(Edge(start, end, e_type=EdgeType.DEP))
+
+    assert g.allocated >= 5
+    assert g.edges[:g.edge_counter].tolist() == [[0, 1], [1, 2], [2, 3], [3, 4]]
+    assert g.get_where_node_attr('node_type', NodeTypes.VAR) == nodes
+    assert g.zero_in_degree() == [nodes[0]]
+    assert g.topological_nodes().tolist() == nodes
+
+
+def test_topological_sort_reports_cycles():
+    g = Graph()
+    a, b, c, d = [g.add_node(Node(key=k, node_type=NodeTypes.VAR)) for k in 'abcd']
+    for start, end in [(a, b), (b, c), (c, b), (c, d)]:
+        g.add_edge(Edge(start, end, e_type=EdgeType.DEP))
+
+    assert g.topological_nodes().tolist() == [a, b, c, d]
+    assert g.cyclic_components == [['b', 'c']]
+    assert g.cyclic_path.tolist() == [b, c, b]
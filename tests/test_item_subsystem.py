@@ -1,7 +1,7 @@
 import pytest
 
 from numerous.engine.variables import VariableDescription, VariableType
-from numerous.engine.system import Connector, Item
+from numerous.engine.system import Connector, Item, Subsystem
 
 
 
@@ -54,3 +54,22 @@ def test_add_mapping(item_with_namespace):
 
     test_namespace.A_parameter.value = 20
     assert test_namespace.B_state.get_value() == 10
+
+
+def test_register_item_twice(item_with_namespace):
+    system = Subsystem('system')
+    system.register_item(item_with_namespace)
+    with pytest.raises(ValueError, match=r".*is already registered in system.*"):
+        system.register_item(Item('item_with_namespace'))
+
+
+def test_update_paths_after_registration(item_with_namespace):
+    system = Subsystem('system')
+    subsystem = Subsystem('subsystem')
+    system.register_item(subsystem)
+    subsystem.register_item(item_with_namespace)
+    system.update_paths()
+
+    variable = item_with_namespace.test_namespace.A_parameter
+    assert variable.path.path[system.id] == ['system.subsystem.item_with_namespace.test_namespace.A_parameter']
+    assert item_with_namespace.path == ['system', 'subsystem', 'item_with_namespace']
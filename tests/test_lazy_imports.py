@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("module", ['pandas', 'graphviz', 'fmpy', 'networkx'])
+def test_heavy_dependencies_imported_lazily(module):
+    script = f"import sys, numerous.engine.model, numerous.engine.simulation; assert '{module}' not in sys.modules"
+    subprocess.run([sys.executable, '-c', script], check=True)
+
+
+def test_llvm_engine_created_on_first_use():
+    script = "import numerous.engine.model.lowering.llvm_initializer as li; assert li._ee is None; " \
+             "assert li.get_execution_engine() is li.get_execution_engine()"
+    subprocess.run([sys.executable, '-c', script], check=True)
@@ -311,3 +311,27 @@ def test_llvm_idx_write():
 
     assert approx(var_func()) == np.array([1.0, 2.0, 3.0, 4., 100., 6., 7., 8., 9.])
     assert approx(diff(np.array([2.6, 2.2, 2.3]), np.array([0.0]))) == np.array([100, 100., 9.])
+
+
+def test_llvm_functions_compiled_in_parallel():
+    llvm_program = LLVMBuilder(initial_values, variable_names, GLOBAL_VARS, STATES, DERIVATIVES)
+    llvm_names = llvm_program.add_external_functions([(eval_llvm, eval_llvm_signature, 4, [2, 3]),
+                                                      (eval_llvm2, eval_llvm2_signature, 4, [2, 3])], processes=2)
+
+    llvm_program.add_call(llvm_names[eval_llvm.__qualname__],
+                          [VariableArgument("oscillator1.mechanics.x", IS_GLOBAL_VAR),
+                           VariableArgument("oscillator1.mechanics.y", IS_GLOBAL_VAR),
+                           VariableArgument("oscillator1.mechanics.x_dot", IS_GLOBAL_VAR),
+                           VariableArgument("oscillator1.mechanics.y_dot", IS_GLOBAL_VAR)],
+                          target_ids=[2, 3])
+    llvm_program.add_call(llvm_names[eval_llvm2.__qualname__],
+                          [VariableArgument("oscillator1.mechanics.x", IS_GLOBAL_VAR),
+                           VariableArgument("oscillator1.mechanics.y", IS_GLOBAL_VAR),
+                           VariableArgument("oscillator1.mechanics.a", IS_GLOBAL_VAR),
+                           VariableArgument("oscillator1.mechanics.z_dot", IS_GLOBAL_VAR)],
+                          target_ids=[2, 3])
+
+    diff, var_func, _ = llvm_program.generate(filename)
+
+    assert approx(diff(np.array([2.1, 2.2, 2.3]), np.array([0.0]))) == np.array([50, -50, -50.])
+    assert approx(diff(np.array([2.3, 2.2, 2.1]), np.array([0.0]))) == np.array([-100, 100, 99.])
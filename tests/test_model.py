@@ -261,6 +261,43 @@ def test_chain_item_model(ms2, use_llvm):
     assert approx(m1.states_as_vector, rel=0.01) == [2010, 1010, 510, 210]
 
 
+class IntegratedFlow(EquationBase, Item):
+    def __init__(self, tag, flow):
+        super().__init__(tag)
+        mechanics = self.create_namespace('mechanics')
+        self.add_parameter('flow', flow, integrate={'tag': 'volume', 'scale': 2})
+        mechanics.add_equations([self])
+
+
+def test_identical_inline_equations_share_function():
+    system = Subsystem('pipes')
+    system.register_items([IntegratedFlow(f'pipe_{i}', flow=i) for i in range(5)])
+    m1 = Model(system)
+    assert len(m1.equations_parsed) == 1
+    s1 = Simulation(m1, t_start=0, t_stop=10, num=10)
+    s1.solve()
+    assert approx(m1.states_as_vector) == [20 * i for i in range(5)]
+
+
+def test_chain_item_model_compiled_in_parallel(ms2):
+    m1 = Model(ms2, compilation_processes=2)
+    s1 = Simulation(m1, t_start=0, t_stop=1000, num=10)
+    s1.solve()
+    assert approx(m1.states_as_vector, rel=0.01) == [2010, 1010, 510, 210]
+
+
+def test_assembly_phases_recorded(ms2):
+    phases = []
+    m1 = Model(ms2, use_llvm=False, assembly_hook=lambda name, record: phases.append(name))
+    Simulation(m1, t_start=0, t_stop=1, num=1)
+    assembly = m1.info["Assembly"]
+    for phase in ["Namespaces", "Parsing equations", "Remove chains", "Topological sort", "Equation compilation",
+                  "Code generation", "Compiled model", "Total"]:
+        assert assembly[phase]["Time"] >= 0
+        assert phase in phases
+    assert assembly["Total"]["Time"] >= assembly["Equation compilation"]["Time"]
+
+
 @pytest.mark.parametrize("use_llvm", [True, False])
 def test_chain_item_binding_model_nested(ms3, use_llvm):
     ms4 = Subsystem('new_s')
@@ -412,3 +449,26 @@ def test_get_init_variables():
     assert model.get_variables_initial_values()['system.t1.p1'] == p1_val
 
 
+@pytest.mark.parametrize("use_llvm", [True, False])
+def test_set_init_variables_without_recompiling(use_llvm):
+    model = Model(ExponentialDecay(tag='system'), use_llvm=use_llvm)
+    compiled_compute = model.compiled_compute
+    sim = Simulation(model=model, t_start=0, t_stop=10, num=10)
+    sim.solve()
+
+    model.set_variables_initial_values({'system.t1.alpha': 0.2, 'system.t1.x': 2})
+    sim.reset(0)
+    sim.solve()
+
+    assert model.compiled_compute is compiled_compute
+    assert model.get_variables_initial_values()['system.t1.x'] == 2
+    assert approx(sim.model.historian_df['system.t1.x'].values, rel=1e-2) == 2 * np.exp(-0.2 * np.linspace(0, 10, 11))
+
+
+def test_set_init_variables_unknown_path():
+    model = Model(SetVar(tag='system'))
+
+    with pytest.raises(ValueError, match=r".*not found.*"):
+        model.set_variables_initial_values({'system.t1.p2': 1})
+
+
@@ -27,3 +27,12 @@ def test_throw_error():
     with pytest.raises(ValueError, match=r"Only numeric values allowed in variables*"):
         sys = FloatVariables()
         sys.t1.var1.value = "test"
+
+
+def test_variable_paths_extended_once():
+    sys = FloatVariables()
+    var1 = sys.t1.var1
+    assert not hasattr(var1, '__dict__')
+    assert var1.path.path[sys.id] == ['system.t1.var1']
+    var1.path.extend_path(sys.t1.id, sys.id, sys.tag)
+    assert var1.path.path[sys.id] == ['system.t1.var1']